@@ -0,0 +1,75 @@
+"""Throughput of the three JSON formatters."""
+
+import logging
+
+from easy_logging.formatter import (
+    APIFormatter,
+    AuditFormatter,
+    JsonFileFormatter,
+)
+
+
+def make_record(name, level, msg, extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, None, None)
+    record.__dict__.update(extra)
+    return record
+
+
+RECORDS = {
+    "json": make_record(
+        "django", logging.INFO, "Request finished", {"extra": {"user_id": 1}}
+    ),
+    "api": make_record(
+        "easy.request",
+        22,
+        "Audit Internal Request",
+        {
+            "service_name": "review_board",
+            "request_type": "internal",
+            "protocol": "http",
+            "request_repr": {
+                "method": "GET",
+                "path": "/api/v1/patients/",
+                "query_params": {"page": "1"},
+                "headers": {"Content-Type": "application/json"},
+            },
+            "response_repr": {
+                "status_code": 200,
+                "body": {"results": [{"id": i} for i in range(20)]},
+            },
+            "error_message": None,
+            "execution_time": 0.0123,
+        },
+    ),
+    "audit": make_record(
+        "easy.crud",
+        21,
+        "UPDATE event for Patient",
+        {
+            "model": "Patient",
+            "event_type": "UPDATE",
+            "instance_id": "123",
+            "user": {"id": 1, "email": "john.doe@example.com"},
+            "extra": {"changes": {"name": {"before": "a", "after": "b"}}},
+        },
+    ),
+}
+
+FORMATTERS = {
+    "json": JsonFileFormatter,
+    "api": APIFormatter,
+    "audit": AuditFormatter,
+}
+
+
+def run(timer) -> dict:
+    results = {}
+    for name, formatter_class in FORMATTERS.items():
+        formatter = formatter_class()
+        record = RECORDS[name]
+        results[name] = timer.measure(lambda: formatter.format(record), 20000)
+        if hasattr(formatter, "format_bytes"):
+            results[f"{name}_bytes"] = timer.measure(
+                lambda: formatter.format_bytes(record), 20000
+            )
+    return results
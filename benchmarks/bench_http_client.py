@@ -0,0 +1,49 @@
+"""HTTPClient overhead against a local HTTP server."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from requests import Session
+
+from easy_logging.protocols import HTTPClient
+from run import overhead
+
+BODY = json.dumps({"results": [{"id": i} for i in range(50)]}).encode()
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; avoid the delayed-ACK stall
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(timer) -> dict:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_port}/patients/"
+
+    try:
+        session = Session()
+        client = HTTPClient("benchmark")
+        baseline = timer.measure(lambda: session.get(url), 300)
+        measured = timer.measure(lambda: client.get(url), 300)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    return {
+        "session_get": baseline,
+        "get": dict(measured, overhead_us=overhead(measured, baseline)),
+    }
@@ -0,0 +1,30 @@
+"""EasyLoggingMiddleware overhead per request."""
+
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory
+
+from easy_logging.middleware import EasyLoggingMiddleware
+from project import urls
+from run import overhead
+
+VIEWS = {
+    "small": ("/small/", urls.small),
+    "large": ("/large/", urls.large),
+    "excluded": ("/excluded/", urls.small),
+}
+
+
+def run(timer) -> dict:
+    factory = RequestFactory()
+    results = {}
+    for name, (path, view) in VIEWS.items():
+        request = factory.get(path, {"page": "1"})
+        request.user = AnonymousUser()
+        middleware = EasyLoggingMiddleware(view)
+
+        number = 200 if name == "large" else 2000
+        baseline = timer.measure(lambda: view(request), number)
+        measured = timer.measure(lambda: middleware(request), number)
+        results[f"{name}_view"] = baseline
+        results[name] = dict(measured, overhead_us=overhead(measured, baseline))
+    return results
@@ -0,0 +1,64 @@
+"""
+Cost of model operations on a model patched by setup_model_signals
+(AuditedRecord) against an identical unpatched one (PlainRecord).
+"""
+
+from project.benchapp.models import AuditedRecord, PlainRecord
+from run import overhead
+
+BULK_SIZE = 100
+
+
+def get_operations(model, timer) -> dict:
+    """name -> (func, number, setup) for one model."""
+    instance = model.objects.create(name="updated", value=0)
+    bulk = []
+    to_delete = []
+
+    def save_create():
+        model(name="created", value=1).save()
+
+    def save_update():
+        instance.value += 1
+        instance.save()
+
+    def bulk_create():
+        bulk[:] = model.objects.bulk_create(
+            [model(name=f"bulk {i}", value=i) for i in range(BULK_SIZE)]
+        )
+
+    def bulk_update():
+        for obj in bulk:
+            obj.value += 1
+        model.objects.bulk_update(bulk, ["value"])
+
+    def create_deleted():
+        to_delete[:] = model.objects.bulk_create(
+            [model(name="deleted") for _ in range(timer.count(300))]
+        )
+
+    def delete():
+        to_delete.pop().delete()
+
+    return {
+        "save_create": (save_create, 500, None),
+        "save_update": (save_update, 500, None),
+        "bulk_create": (bulk_create, 20, None),
+        "bulk_update": (bulk_update, 20, bulk_create),
+        "delete": (delete, 300, create_deleted),
+    }
+
+
+def run(timer) -> dict:
+    plain = get_operations(PlainRecord, timer)
+    audited = get_operations(AuditedRecord, timer)
+    results = {}
+    for name, (func, number, setup) in audited.items():
+        baseline = timer.measure(*plain[name])
+        measured = timer.measure(func, number, setup)
+        results[name] = dict(
+            measured,
+            baseline_us_per_op=baseline["us_per_op"],
+            overhead_us=overhead(measured, baseline),
+        )
+    return results
@@ -0,0 +1,166 @@
+"""
+Stress test for EasyLoggingMiddleware under concurrent requests.
+
+Sends requests from many threads (WSGI) and as many concurrent tasks (ASGI)
+through the middleware and checks that every logged record pairs a request
+with its own response, i.e. no request data leaked between requests.
+
+Usage:
+    python benchmarks/middleware_concurrency.py [--requests N] [--threads N]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import django
+from django.conf import settings
+
+
+class CollectHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def configure():
+    settings.configure(
+        DEBUG=False,
+        SECRET_KEY="benchmark",
+        ALLOWED_HOSTS=["*"],
+        ROOT_URLCONF=__name__,
+        INSTALLED_APPS=["django.contrib.auth", "django.contrib.contenttypes"],
+        MIDDLEWARE=[],
+        DATABASES={
+            "default": {
+                "ENGINE": "django.db.backends.sqlite3",
+                "NAME": os.path.join(tempfile.mkdtemp(), "db.sqlite3"),
+            }
+        },
+    )
+    django.setup()
+
+
+def echo(request):
+    from django.http import JsonResponse
+
+    return JsonResponse({"marker": request.GET.get("marker")})
+
+
+urlpatterns = []
+
+
+def make_request(factory, marker):
+    from django.contrib.auth.models import AnonymousUser
+
+    request = factory.get("/echo/", {"marker": marker})
+    request.user = AnonymousUser()
+    return request
+
+
+def check(records, expected):
+    mismatched = 0
+    for record in records:
+        sent = record.request_repr["query_params"]["marker"]
+        body = record.response_repr["body"]
+        if isinstance(body, str):
+            body = json.loads(body)
+        received = body["marker"]
+        if sent != received:
+            mismatched += 1
+    return {
+        "logged": len(records),
+        "expected": expected,
+        "mismatched": mismatched,
+    }
+
+
+def run_wsgi(count, threads):
+    from django.test import RequestFactory
+    from easy_logging.middleware import EasyLoggingMiddleware
+
+    middleware = EasyLoggingMiddleware(echo)
+    factory = RequestFactory()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(
+            pool.map(
+                lambda i: middleware(make_request(factory, str(i))),
+                range(count),
+            )
+        )
+    return time.perf_counter() - started
+
+
+def run_asgi(count):
+    from asgiref.sync import sync_to_async
+    from django.test import RequestFactory
+    from easy_logging.middleware import EasyLoggingMiddleware
+
+    async def view(request):
+        await asyncio.sleep(0)
+        return await sync_to_async(echo)(request)
+
+    middleware = EasyLoggingMiddleware(view)
+    factory = RequestFactory()
+
+    async def main():
+        await asyncio.gather(
+            *(middleware(make_request(factory, str(i))) for i in range(count))
+        )
+
+    started = time.perf_counter()
+    asyncio.run(main())
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=32)
+    args = parser.parse_args()
+
+    configure()
+    from easy_logging.logger_level import API
+
+    handler = CollectHandler()
+    request_logger = logging.getLogger("easy.request")
+    request_logger.addHandler(handler)
+    request_logger.setLevel(API)
+    request_logger.propagate = False
+
+    results = {}
+    for name, run in (
+        ("wsgi", lambda: run_wsgi(args.requests, args.threads)),
+        ("asgi", lambda: run_asgi(args.requests)),
+    ):
+        handler.records = []
+        elapsed = run()
+        results[name] = dict(
+            check(handler.records, args.requests),
+            seconds=round(elapsed, 3),
+            requests_per_second=round(args.requests / elapsed),
+        )
+
+    print(json.dumps(results, indent=2))
+    failed = any(
+        result["mismatched"] or result["logged"] != result["expected"]
+        for result in results.values()
+    )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+from django.db import models
+
+
+class AuditedRecord(models.Model):
+    name = models.CharField(max_length=100)
+    value = models.IntegerField(default=0)
+
+
+class PlainRecord(models.Model):
+    """Same table layout, left unpatched by setup_model_signals."""
+
+    easy_audit_ignore = True
+
+    name = models.CharField(max_length=100)
+    value = models.IntegerField(default=0)
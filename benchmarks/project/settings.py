@@ -0,0 +1,66 @@
+"""Settings of the local SQLite project the benchmarks run against."""
+
+import os
+import tempfile
+
+from easy_logging import (
+    get_api_file_formatter,
+    get_audit_file_formatter,
+    get_api_handler,
+    get_audit_handler,
+)
+
+WORK_DIR = os.environ.get("EASY_BENCH_DIR") or tempfile.mkdtemp(
+    prefix="easy-bench-"
+)
+
+SECRET_KEY = "benchmarks"
+DEBUG = False
+ALLOWED_HOSTS = ["*"]
+USE_TZ = True
+ROOT_URLCONF = "project.urls"
+DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+INSTALLED_APPS = [
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "easy_logging",
+    "project.benchapp",
+]
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.path.join(WORK_DIR, "db.sqlite3"),
+    }
+}
+
+DJANGO_EASY_AUDIT_UNREGISTERED_URLS_EXTRA = [r"^/excluded/"]
+DJANGO_EASY_AUDIT_MAX_BODY_BYTES = 1024 * 1024
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "api_json": get_api_file_formatter(),
+        "audit_json": get_audit_file_formatter(),
+    },
+    "handlers": {
+        "api_file": get_api_handler(filename=os.path.join(WORK_DIR, "api.log")),
+        "audit_file": get_audit_handler(
+            filename=os.path.join(WORK_DIR, "audit.log")
+        ),
+    },
+    "loggers": {
+        "easy.request": {
+            "handlers": ["api_file"],
+            "level": "API",
+            "propagate": False,
+        },
+        "easy.crud": {
+            "handlers": ["audit_file"],
+            "level": "AUDIT",
+            "propagate": False,
+        },
+    },
+}
@@ -0,0 +1,19 @@
+from django.http import JsonResponse
+from django.urls import path
+
+LARGE_PAYLOAD = {"items": [{"id": i, "name": f"item {i}"} for i in range(5000)]}
+
+
+def small(request):
+    return JsonResponse({"ok": True})
+
+
+def large(request):
+    return JsonResponse(LARGE_PAYLOAD)
+
+
+urlpatterns = [
+    path("small/", small),
+    path("large/", large),
+    path("excluded/", small),
+]
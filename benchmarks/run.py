@@ -0,0 +1,154 @@
+"""
+Benchmark suite for easy_logging overhead.
+
+Runs against a local SQLite Django project (benchmarks/project) and prints
+one JSON document, so results can be stored and compared across commits:
+
+    python benchmarks/run.py --output before.json
+    python benchmarks/run.py --compare before.json
+
+Suites: middleware, formatters, signals, http_client (default: all).
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project.settings")
+
+SUITES = ["middleware", "formatters", "signals", "http_client"]
+
+
+class Timer:
+    """
+    Runs a callable ``number`` times per round for ``repeat`` rounds after
+    one warm-up round, and reports the time per call in microseconds.
+    """
+
+    def __init__(self, repeat: int, scale: float):
+        self.repeat = repeat
+        self.scale = scale
+
+    def count(self, number: int) -> int:
+        return max(1, int(number * self.scale))
+
+    def measure(self, func, number: int, setup=None) -> dict:
+        number = self.count(number)
+        rounds = []
+        for round_index in range(self.repeat + 1):
+            if setup is not None:
+                setup()
+            started = time.perf_counter()
+            for _ in range(number):
+                func()
+            elapsed = time.perf_counter() - started
+            if round_index:
+                rounds.append(elapsed / number * 1e6)
+        return {
+            "us_per_op": round(statistics.median(rounds), 3),
+            "us_per_op_min": round(min(rounds), 3),
+            "ops_per_second": round(1e6 / statistics.median(rounds), 1),
+            "number": number,
+            "repeat": self.repeat,
+        }
+
+
+def overhead(measured: dict, baseline: dict) -> float:
+    """Extra microseconds per operation over the baseline."""
+    return round(measured["us_per_op"] - baseline["us_per_op"], 3)
+
+
+def get_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCH_DIR,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: dict, previous: dict) -> dict:
+    """Relative change of us_per_op per benchmark, e.g. -0.1 is 10% faster."""
+    changes = {}
+    for suite, benchmarks in results.items():
+        for name, result in benchmarks.items():
+            before = previous.get("results", {}).get(suite, {}).get(name)
+            if isinstance(result, dict) and isinstance(before, dict):
+                if before.get("us_per_op"):
+                    changes[f"{suite}.{name}"] = round(
+                        result["us_per_op"] / before["us_per_op"] - 1, 4
+                    )
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("suites", nargs="*", metavar="suite")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Multiply the number of operations per round",
+    )
+    parser.add_argument("--output", help="Also write the results to a file")
+    parser.add_argument("--compare", help="Results file of an earlier run")
+    args = parser.parse_args()
+    unknown = set(args.suites) - set(SUITES)
+    if unknown:
+        parser.error(f"suites must be in {SUITES}, got {sorted(unknown)}")
+
+    import django
+
+    django.setup()
+    from django.core.management import call_command
+
+    call_command("migrate", run_syncdb=True, verbosity=0)
+
+    import importlib
+
+    timer = Timer(args.repeat, args.scale)
+    results = {}
+    for suite in args.suites or SUITES:
+        module = importlib.import_module(f"bench_{suite}")
+        results[suite] = module.run(timer)
+
+    output = {
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    if args.compare:
+        with open(args.compare) as file:
+            output["changes"] = compare(results, json.load(file))
+
+    document = json.dumps(output, indent=2)
+    print(document)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(document + "\n")
+
+    from django.conf import settings
+
+    logging.shutdown()
+    if not os.environ.get("EASY_BENCH_DIR"):
+        shutil.rmtree(settings.WORK_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,8 +8,13 @@ from easy_logging.utils import (
     get_json_file_handler,
     get_api_handler,
     get_audit_handler,
+    get_queued_handler,
+    get_network_handler,
+    get_database_handler,
 )
 
+from easy_logging.stats import get_stats, reset_stats
+
 from easy_logging.logger_level import API, AUDIT
 
 __all__ = [
@@ -20,4 +25,9 @@ __all__ = [
     "get_json_file_handler",
     "get_api_handler",
     "get_audit_handler",
+    "get_queued_handler",
+    "get_network_handler",
+    "get_database_handler",
+    "get_stats",
+    "reset_stats",
 ]
@@ -16,3 +16,10 @@ class EasyLoggingConfig(AppConfig):
 
         # Initialize signals
         from . import signals  # noqa
+
+        from .settings import STATS_FILE, STATS_INTERVAL
+
+        if STATS_INTERVAL:
+            from .stats import start_reporter
+
+            start_reporter(STATS_INTERVAL, STATS_FILE)
@@ -0,0 +1,122 @@
+import itertools
+from functools import partial
+from typing import Callable, Dict, FrozenSet, Hashable, List
+
+from django.db import transaction
+
+# Event types merged per (model label, instance_id) within a transaction
+COALESCED_EVENT_TYPES = ("CREATE", "UPDATE", "DELETE")
+
+_unique_keys = itertools.count()
+_tokens = itertools.count(1)
+
+
+def merge_extra(previous: dict, current: dict) -> dict:
+    """
+    Merge the extra of two events on the same object. Field changes keep the
+    first "before" and the last "after"; other keys take the latest value.
+    """
+    merged = {**previous, **current}
+    if isinstance(previous.get("changes"), dict) and isinstance(
+        current.get("changes"), dict
+    ):
+        changes = dict(previous["changes"])
+        for field, change in current["changes"].items():
+            if isinstance(change, dict) and isinstance(
+                changes.get(field), dict
+            ):
+                changes[field] = {
+                    **change,
+                    "before": changes[field].get("before"),
+                }
+            else:
+                changes[field] = change
+        merged["changes"] = changes
+    return merged
+
+
+def coalesce(previous: dict, current: dict) -> dict:
+    """Combine two events on the same object into one."""
+    if current["event_type"] == "DELETE" or previous["event_type"] == "DELETE":
+        return current
+    # CREATE followed by UPDATE stays a CREATE
+    event = dict(current, event_type=previous["event_type"])
+    event["message"] = previous["message"]
+    event["extra"] = merge_extra(previous["extra"], current["extra"])
+    return event
+
+
+class TransactionBuffer:
+    """
+    Audit events of the current transaction on one connection.
+
+    Every event is registered with ``transaction.on_commit``, so Django drops
+    it with its savepoint or transaction on rollback. Committed events are
+    coalesced here and written as one batch once no later event is sure to
+    follow: an event registered later under the same savepoints (or fewer)
+    is dropped only together with the current one, so it still runs and the
+    batch waits for it. Events in a savepoint entered after the last such
+    event are written in batches of their own.
+    """
+
+    def __init__(self, connection, write: Callable[[List[dict]], None]):
+        self.connection = connection
+        self.write = write
+        self.events: Dict[Hashable, dict] = {}
+        # Savepoints -> token of the latest event registered under them
+        self.latest: Dict[FrozenSet[str], int] = {}
+
+    def defer(self, event: dict, label: str) -> None:
+        """Hold ``event`` on ``label`` (the model label) until the commit."""
+        token = next(_tokens)
+        # Blocks entered with savepoint=False have no id and are only undone
+        # with the whole transaction
+        savepoints = frozenset(filter(None, self.connection.savepoint_ids))
+        self.latest[savepoints] = token
+        transaction.on_commit(
+            partial(self.add, token, savepoints, label, event),
+            self.connection.alias,
+            robust=True,
+        )
+
+    def add(
+        self, token: int, savepoints: FrozenSet[str], label: str, event: dict
+    ) -> None:
+        if event["event_type"] in COALESCED_EVENT_TYPES:
+            key = (label, event["instance_id"])
+        else:
+            key = next(_unique_keys)
+
+        previous = self.events.get(key)
+        self.events[key] = (
+            event if previous is None else coalesce(previous, event)
+        )
+        if not self.is_followed(token, savepoints):
+            self.flush()
+
+    def is_followed(self, token: int, savepoints: FrozenSet[str]) -> bool:
+        """Whether an event registered after ``token`` is sure to commit."""
+        followed = False
+        for key, latest in list(self.latest.items()):
+            if latest <= token:
+                # Already run, or dropped with a rolled back savepoint or
+                # transaction
+                del self.latest[key]
+            elif key <= savepoints:
+                followed = True
+        return followed
+
+    def flush(self) -> None:
+        events, self.events = self.events, {}
+        if events:
+            self.write(list(events.values()))
+
+
+def get_buffer(
+    connection, write: Callable[[List[dict]], None]
+) -> TransactionBuffer:
+    buffer = getattr(connection, "_easy_audit_buffer", None)
+    if buffer is None:
+        buffer = TransactionBuffer(connection, write)
+        connection._easy_audit_buffer = buffer
+    return buffer
@@ -0,0 +1,136 @@
+import json
+from fnmatch import fnmatchcase
+from functools import lru_cache
+from typing import Any, Iterable
+
+from django.http.request import RawPostDataException
+
+# Returned when a body is not logged at all
+NOT_CAPTURED = object()
+
+BINARY_CONTENT = "Binary content"
+
+# Logged for request bodies sent from files or generators
+STREAMED_CONTENT = "Streamed content"
+
+
+def get_mime_type(content_type: str) -> str:
+    return content_type.split(";", 1)[0].strip().lower()
+
+
+class BodyCapture:
+    """
+    Decides which request/response bodies are logged and how much of them.
+
+    Only content types matching ``content_types`` (and none of
+    ``skip_content_types``) are logged; both accept wildcards such as
+    "text/*". Bodies longer than ``max_bytes`` are cut and marked as
+    truncated, and are never parsed. Streaming responses are never read.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024,
+        content_types: Iterable[str] = ("application/json",),
+        skip_content_types: Iterable[str] = (),
+        parse: bool = True,
+    ):
+        self.max_bytes = max_bytes
+        self.content_types = tuple(p.lower() for p in content_types)
+        self.skip_content_types = tuple(p.lower() for p in skip_content_types)
+        self.parse = parse
+        self.allows = lru_cache(maxsize=256)(self._allows)
+
+    def _allows(self, content_type: str) -> bool:
+        mime_type = get_mime_type(content_type)
+        if any(fnmatchcase(mime_type, p) for p in self.skip_content_types):
+            return False
+        return any(fnmatchcase(mime_type, p) for p in self.content_types)
+
+    def truncated(self, content: bytes, size: int, charset: str) -> str:
+        text = content[: self.max_bytes].decode(charset, "ignore")
+        return f"{text}...[truncated, {size} bytes]"
+
+    def render(self, content: bytes, content_type: str, charset: str) -> Any:
+        """Turn a complete body into its logged representation."""
+        if not content:
+            return NOT_CAPTURED
+        if len(content) > self.max_bytes:
+            return self.truncated(content, len(content), charset)
+        try:
+            text = content.decode(charset)
+        except (UnicodeDecodeError, LookupError):
+            return BINARY_CONTENT
+        if self.parse and "json" in get_mime_type(content_type):
+            try:
+                return json.loads(text)
+            except ValueError:
+                pass
+        return text
+
+    def request_body(self, request) -> Any:
+        content_type = request.META.get("CONTENT_TYPE", "")
+        if not content_type or not self.allows(content_type):
+            return NOT_CAPTURED
+
+        # Do not pull a large body into memory just to log a part of it
+        try:
+            size = int(request.META.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            size = 0
+        if size > self.max_bytes:
+            return f"[not captured, {size} bytes]"
+
+        try:
+            content = request.body
+        except RawPostDataException:
+            return NOT_CAPTURED
+        return self.render(content, content_type, request.encoding or "utf-8")
+
+    def response_body(self, response) -> Any:
+        if getattr(response, "streaming", False):
+            return NOT_CAPTURED
+        content_type = response.get("Content-Type", "")
+        if not self.allows(content_type):
+            return NOT_CAPTURED
+        return self.render(response.content, content_type, response.charset)
+
+    def structured_body(self, data: Any) -> Any:
+        """
+        A body given as Python objects (``json=``, form fields), kept as is
+        unless its JSON form is longer than ``max_bytes``.
+        """
+        content = json.dumps(data, default=str).encode("utf-8")
+        if len(content) > self.max_bytes:
+            return self.truncated(content, len(content), "utf-8")
+        return data
+
+    def client_request_body(self, data: Any, content_type: str) -> Any:
+        """Body of a request sent with ``HTTPClient``/``AsyncHTTPClient``."""
+        if data is None:
+            return NOT_CAPTURED
+        if isinstance(data, (dict, list, tuple)):
+            # Form fields
+            return self.structured_body(data)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if not isinstance(data, (bytes, bytearray)):
+            # Files and generators are never read just to log them
+            return STREAMED_CONTENT
+        if content_type and not self.allows(content_type):
+            return NOT_CAPTURED
+        return self.render(bytes(data), content_type, "utf-8")
+
+    def client_response_body(self, response, stream: bool = False) -> Any:
+        """
+        Body of a ``requests`` or ``httpx`` response. Streamed responses are
+        left for the caller to consume.
+        """
+        if stream:
+            return NOT_CAPTURED
+        content_type = response.headers.get("Content-Type", "")
+        if not self.allows(content_type):
+            return NOT_CAPTURED
+        return self.render(
+            response.content, content_type, response.encoding or "utf-8"
+        )
@@ -6,3 +6,30 @@ REQUEST_TYPES = [
     "internal",
     "external",
 ]
+
+# What a queued handler does when its queue is full
+OVERFLOW_POLICIES = [
+    "block",
+    "drop_oldest",
+    "drop_newest",
+]
+
+# When a file handler calls fsync() after writing
+FSYNC_POLICIES = [
+    "never",
+    "batch",
+    "interval",
+]
+
+# How rotated log segments are compressed
+COMPRESSION_METHODS = [
+    "none",
+    "gzip",
+    "zstd",
+]
+
+# How the network sink reaches its collector
+NETWORK_TRANSPORTS = [
+    "http",
+    "tcp",
+]
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class EasyLoggingDBConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "easy_logging.db"
+    label = "easy_logging_db"
+    verbose_name = "Easy Audit Logging Database"
@@ -0,0 +1,90 @@
+import datetime
+import logging
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from easy_logging.constants import OVERFLOW_POLICIES
+from easy_logging.handlers import QueueWriterMixin
+from easy_logging.settings import DB_ALIAS
+from easy_logging.stats import register
+
+
+class DatabaseLogHandler(QueueWriterMixin, logging.Handler):
+    """
+    Stores audit records as ``AuditEvent`` rows.
+
+    Records are queued and batched like ``QueuedEasyLogHandler``; a
+    background thread inserts each batch with one ``bulk_create`` on the
+    ``using`` database alias, outside the transaction of the request that
+    produced it. The insert bypasses the audit patch of ``bulk_create``, so
+    storing events never produces new ones.
+    """
+
+    def __init__(
+        self,
+        using=None,
+        queue_size=10000,
+        overflow=OVERFLOW_POLICIES[0],
+        batch_size=500,
+        batch_interval=1000,
+    ):
+        super().__init__()
+        self.using = using or DB_ALIAS
+        self.written = 0
+        self.failed = 0
+        register(self)
+        self.start_writer(queue_size, overflow, batch_size, batch_interval)
+
+    def get_event(self, record):
+        from .models import AuditEvent
+
+        timestamp = datetime.datetime.fromtimestamp(
+            record.created, datetime.timezone.utc
+        )
+        if not settings.USE_TZ:
+            timestamp = timezone.make_naive(timestamp)
+        return AuditEvent(
+            timestamp=timestamp,
+            level=record.levelname,
+            name=record.name,
+            message=record.getMessage(),
+            model=getattr(record, "model", ""),
+            event_type=getattr(record, "event_type", ""),
+            instance_id=str(getattr(record, "instance_id", "")),
+            user=getattr(record, "user", None) or {},
+            extra=getattr(record, "extra", None) or {},
+        )
+
+    def write_records(self, records):
+        from easy_logging.signals import original_bulk_create
+        from .models import AuditEvent
+
+        try:
+            started = time.perf_counter()
+            events = [self.get_event(record) for record in records]
+            converted = time.perf_counter()
+            # Drop a connection the database closed while the writer was idle
+            connections[self.using].close_if_unusable_or_obsolete()
+            original_bulk_create(
+                AuditEvent.objects.using(self.using).all(), events
+            )
+            self.written += len(events)
+        except Exception as e:
+            self.failed += len(records)
+            self.metrics.add_error(e)
+            logging.getLogger().error(f"Error in DatabaseLogHandler: {str(e)}")
+            return
+        # Rows have no byte size here
+        self.metrics.add_batch(
+            records, converted - started, time.perf_counter() - converted, 0
+        )
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            "written": self.written,
+            "failed": self.failed,
+        }
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:26
+
+import easy_logging.db.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="AuditEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("timestamp", models.DateTimeField()),
+                ("level", models.CharField(max_length=16)),
+                ("name", models.CharField(max_length=255)),
+                ("message", models.TextField()),
+                ("model", models.CharField(max_length=255)),
+                ("event_type", models.CharField(max_length=32)),
+                ("instance_id", models.CharField(max_length=255)),
+                (
+                    "user",
+                    models.JSONField(
+                        default=dict,
+                        encoder=easy_logging.db.models.AuditEventEncoder,
+                    ),
+                ),
+                (
+                    "extra",
+                    models.JSONField(
+                        default=dict,
+                        encoder=easy_logging.db.models.AuditEventEncoder,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["timestamp", "id"],
+                "indexes": [
+                    models.Index(
+                        fields=["model", "instance_id", "timestamp"],
+                        name="easy_audit_instance_idx",
+                    ),
+                    models.Index(
+                        fields=["timestamp"], name="easy_audit_timestamp_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
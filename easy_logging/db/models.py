@@ -0,0 +1,42 @@
+import json
+
+from django.db import models
+
+from easy_logging.encoders import coerce
+
+
+class AuditEventEncoder(json.JSONEncoder):
+    """Serializes values the same way as the log file encoders."""
+
+    def default(self, o):
+        return coerce(o)
+
+
+class AuditEvent(models.Model):
+    """An audit record written by ``DatabaseLogHandler``."""
+
+    # Never audit the audit table itself
+    easy_audit_ignore = True
+
+    timestamp = models.DateTimeField()
+    level = models.CharField(max_length=16)
+    name = models.CharField(max_length=255)
+    message = models.TextField()
+    model = models.CharField(max_length=255)
+    event_type = models.CharField(max_length=32)
+    instance_id = models.CharField(max_length=255)
+    user = models.JSONField(default=dict, encoder=AuditEventEncoder)
+    extra = models.JSONField(default=dict, encoder=AuditEventEncoder)
+
+    class Meta:
+        ordering = ["timestamp", "id"]
+        indexes = [
+            models.Index(
+                fields=["model", "instance_id", "timestamp"],
+                name="easy_audit_instance_idx",
+            ),
+            models.Index(fields=["timestamp"], name="easy_audit_timestamp_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} {self.model} {self.instance_id}"
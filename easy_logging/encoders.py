@@ -0,0 +1,160 @@
+import datetime
+import decimal
+import json
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from django.db import models
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+ENCODER_BACKENDS = ["auto", "orjson", "msgspec", "json"]
+
+# Type coercion table shared by every backend. Types are looked up along the
+# MRO, so subclasses (e.g. every model) use the entry of their base class.
+COERCIONS: Dict[type, Callable[[Any], Any]] = {
+    datetime.datetime: lambda value: value.isoformat(),
+    datetime.date: lambda value: value.isoformat(),
+    datetime.time: lambda value: value.isoformat(),
+    datetime.timedelta: lambda value: value.total_seconds(),
+    decimal.Decimal: str,
+    uuid.UUID: str,
+    models.Model: lambda value: str(value.pk),
+    set: list,
+    frozenset: list,
+    bytes: lambda value: value.decode("utf-8", "replace"),
+}
+
+# Types msgspec encodes natively, but not the way COERCIONS does (e.g.
+# timedelta as "PT3600S" and bytes as base64); converted before encoding
+MSGSPEC_COERCED = (
+    datetime.datetime,
+    datetime.date,
+    datetime.time,
+    datetime.timedelta,
+    bytes,
+)
+
+_resolved: Dict[type, Optional[Callable[[Any], Any]]] = {}
+
+
+def register_coercion(type_: type, func: Callable[[Any], Any]) -> None:
+    """Teach every encoder backend how to serialize ``type_``."""
+    COERCIONS[type_] = func
+    _resolved.clear()
+
+
+def coerce(value: Any) -> Any:
+    """
+    Convert a value the JSON backends do not support natively. Unknown types
+    fall back to ``str`` so a log line is never lost to a TypeError.
+    """
+    cls = type(value)
+    try:
+        func = _resolved[cls]
+    except KeyError:
+        func = next(
+            (COERCIONS[base] for base in cls.__mro__ if base in COERCIONS),
+            None,
+        )
+        _resolved[cls] = func
+    if func is None:
+        return str(value)
+    return func(value)
+
+
+def coerce_nested(value: Any, types: tuple) -> Any:
+    """Run ``coerce`` on every value of ``types`` in dicts, lists and tuples."""
+    if isinstance(value, dict):
+        return {k: coerce_nested(v, types) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [coerce_nested(v, types) for v in value]
+    if isinstance(value, types):
+        return coerce(value)
+    return value
+
+
+class JSONEncoder:
+    """
+    Standard library json backend, writing the same compact UTF-8 lines as
+    orjson and msgspec.
+    """
+
+    name = "json"
+
+    def dumps(self, data: Any) -> str:
+        return json.dumps(
+            data, default=coerce, separators=(",", ":"), ensure_ascii=False
+        )
+
+    def dumps_bytes(self, data: Any) -> bytes:
+        # Lone surrogates stay \uXXXX escapes, as with ensure_ascii
+        return self.dumps(data).encode("utf-8", "backslashreplace")
+
+
+class OrjsonEncoder:
+    """
+    orjson backend. Dates and times go through ``coerce`` like in the other
+    backends; a record orjson cannot encode, such as one with an integer
+    beyond 64 bits, is encoded by the standard library instead.
+    """
+
+    name = "orjson"
+
+    def __init__(self):
+        self.option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        self.fallback = JSONEncoder()
+
+    def dumps(self, data: Any) -> str:
+        return self.dumps_bytes(data).decode("utf-8")
+
+    def dumps_bytes(self, data: Any) -> bytes:
+        try:
+            return orjson.dumps(data, default=coerce, option=self.option)
+        except TypeError:
+            return self.fallback.dumps_bytes(data)
+
+
+class MsgspecEncoder:
+    """
+    msgspec backend. ``enc_hook`` only sees types msgspec cannot encode, so
+    the ones it encodes differently (``MSGSPEC_COERCED``) are converted
+    first.
+    """
+
+    name = "msgspec"
+
+    def __init__(self):
+        self.encoder = msgspec.json.Encoder(enc_hook=coerce)
+
+    def dumps(self, data: Any) -> str:
+        return self.dumps_bytes(data).decode("utf-8")
+
+    def dumps_bytes(self, data: Any) -> bytes:
+        return self.encoder.encode(coerce_nested(data, MSGSPEC_COERCED))
+
+
+def get_encoder(backend: str = "auto"):
+    """
+    Return an encoder for ``backend``. "auto" picks orjson, then msgspec,
+    then the standard library, depending on what is installed.
+    """
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(
+            f"encoder must be one of {ENCODER_BACKENDS}, got {backend!r}"
+        )
+    if backend in ("auto", "orjson") and orjson is not None:
+        return OrjsonEncoder()
+    if backend in ("auto", "msgspec") and msgspec is not None:
+        return MsgspecEncoder()
+    if backend != "auto" and backend != "json":
+        raise ImportError(f"{backend} is not installed")
+    return JSONEncoder()
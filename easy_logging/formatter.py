@@ -1,112 +1,194 @@
 import logging
 import datetime
-import json
-
-
-class JsonFileFormatter(logging.Formatter):
-    def __init__(self, timestamp_format: str = "%Y-%m-%d %H:%M:%S.%f"):
+import math
+from typing import Callable, Iterable, List, Optional, Tuple, Union
+
+from .encoders import get_encoder
+
+Getter = Union[str, Callable[[logging.LogRecord], object]]
+
+
+# Attributes every LogRecord has, read directly instead of with getattr()
+RECORD_ATTRIBUTES = frozenset(
+    logging.LogRecord("", 0, "", 0, "", None, None).__dict__
+)
+
+
+def compile_serializer(schema: List[Tuple[str, Getter]]):
+    """
+    Build a function returning the log dict for a record as a single dict
+    literal, so formatting does not loop over the schema for every record.
+    """
+    namespace = {}
+    items = []
+    for index, (key, getter) in enumerate(schema):
+        if getter in RECORD_ATTRIBUTES:
+            value = f"record.{getter}"
+        elif isinstance(getter, str):
+            value = f"getattr(record, {getter!r}, None)"
+        else:
+            namespace[f"getter_{index}"] = getter
+            value = f"getter_{index}(record)"
+        items.append(f"{key!r}: {value}")
+
+    source = "def serialize(record):\n    return {%s}\n" % ", ".join(items)
+    exec(source, namespace)
+    return namespace["serialize"]
+
+
+class EasyFormatter(logging.Formatter):
+    """
+    Base class for the JSON formatters.
+
+    Subclasses describe their output in ``get_schema`` as (key, getter) pairs,
+    where a string getter names a record attribute. The schema is compiled
+    once into a serializer; ``fields`` projects it to a subset (or adds record
+    attributes by name) and ``exclude`` drops keys. ``format`` returns str and
+    ``format_bytes`` UTF-8 bytes, so file handlers can write without
+    re-encoding.
+    """
+
+    def __init__(
+        self,
+        timestamp_format: str = "%Y-%m-%d %H:%M:%S.%f",
+        encoder: str = "auto",
+        fields: Optional[Iterable[str]] = None,
+        exclude: Optional[Iterable[str]] = None,
+    ):
         super().__init__()
         self.timestamp_format = timestamp_format
+        self.encoder = get_encoder(encoder)
+        # Only the seconds part of the timestamp is rendered with strftime,
+        # once per second; milliseconds are appended to the cached prefix.
+        self._timestamp_cache: Tuple[Optional[int], str] = (None, "")
+        self._timestamp_prefix = timestamp_format.endswith("%f")
+        self._timestamp_cacheable = (
+            self._timestamp_prefix or "%f" not in timestamp_format
+        )
+        self.serialize = self.compile_schema(fields, exclude or ())
+
+    def get_schema(self) -> List[Tuple[str, Getter]]:
+        return [
+            ("timestamp", self.format_timestamp),
+            ("level", "levelname"),
+            ("name", "name"),
+            ("message", logging.LogRecord.getMessage),
+        ]
 
-    def format(
-        self,
-        record,
-    ):
-        log_data = {
-            "timestamp": datetime.datetime.fromtimestamp(
-                record.created
-            ).strftime(self.timestamp_format)[:-3],
-            "level": record.levelname,
-            "name": record.name,
-            "path": record.pathname,
-            "module": record.module,
-            "function": record.funcName,
-            "message": record.getMessage(),
-            "exception": "",
-            "request": "",
-            "extra": "",
-        }
+    def compile_schema(self, fields, exclude):
+        schema = dict(self.get_schema())
+        names = list(schema) if fields is None else list(fields)
+        return compile_serializer(
+            [
+                (name, schema.get(name, name))
+                for name in names
+                if name not in exclude
+            ]
+        )
+
+    def format_timestamp(self, record) -> str:
+        if not self._timestamp_cacheable:
+            return datetime.datetime.fromtimestamp(record.created).strftime(
+                self.timestamp_format
+            )[:-3]
+
+        # Split like datetime.fromtimestamp() does, which rounds to the
+        # nearest microsecond
+        fraction, second = math.modf(record.created)
+        second = int(second)
+        micros = round(fraction * 1e6)
+        if micros >= 1000000:
+            second += 1
+            micros -= 1000000
+        cached_second, text = self._timestamp_cache
+        if cached_second != second:
+            if self._timestamp_prefix:
+                text = datetime.datetime.fromtimestamp(second).strftime(
+                    self.timestamp_format[:-2]
+                )
+            else:
+                text = datetime.datetime.fromtimestamp(second).strftime(
+                    self.timestamp_format
+                )[:-3]
+            self._timestamp_cache = (second, text)
+
+        if self._timestamp_prefix:
+            return f"{text}{micros // 1000:03d}"
+        return text
+
+    def get_log_data(self, record) -> dict:
+        return self.serialize(record)
 
+    def format(self, record):
+        return self.encoder.dumps(self.get_log_data(record))
+
+    def format_bytes(self, record) -> bytes:
+        return self.encoder.dumps_bytes(self.get_log_data(record))
+
+
+class JsonFileFormatter(EasyFormatter):
+    def get_schema(self):
+        schema = super().get_schema()
+        schema[3:3] = [
+            ("path", "pathname"),
+            ("module", "module"),
+            ("function", "funcName"),
+        ]
+        return schema + [
+            ("exception", self.get_exception),
+            ("request", self.get_request),
+            ("extra", lambda record: ""),
+        ]
+
+    def get_exception(self, record):
         # Add exception info if present for ERROR
         if record.exc_info:
-            log_data["exception"] = "{}".format(
-                self.formatException(record.exc_info)
-            )
+            return "{}".format(self.formatException(record.exc_info))
+        return ""
 
+    def get_request(self, record):
         # Add request info if available
-        if hasattr(record, "request"):
-            log_data["request"] = {
-                "method": getattr(record.request, "method", None),
-                "path": getattr(record.request, "path", None),
-                "user": str(getattr(record.request, "user", None)),
-            }
+        if not hasattr(record, "request"):
+            return ""
+        request = record.request
+        return {
+            "method": getattr(request, "method", None),
+            "path": getattr(request, "path", None),
+            "user": str(getattr(request, "user", None)),
+        }
+
+    def get_log_data(self, record):
+        log_data = super().get_log_data(record)
 
         # Add extra fields if present
         if hasattr(record, "extra"):
             log_data.update(record.extra)
 
-        return json.dumps(log_data)
+        return log_data
 
 
-class APIFormatter(logging.Formatter):
+class APIFormatter(EasyFormatter):
     """Custom formatter for audit logs that ensures consistent JSON formatting."""
 
-    def __init__(self, timestamp_format: str = "%Y-%m-%d %H:%M:%S.%f"):
-        super().__init__()
-        self.timestamp_format = timestamp_format
-
-    def format(self, record):
-        # Start with basic log data
-        log_data = {
-            "timestamp": datetime.datetime.fromtimestamp(
-                record.created
-            ).strftime(self.timestamp_format)[:-3],
-            "level": record.levelname,
-            "name": record.name,
-            "message": record.getMessage(),
-        }
-
-        # Add all audit-specific fields if they exist
-        audit_fields = [
-            "service_name",
-            "request_type",
-            "protocol",
-            "request_repr",
-            "response_repr",
-            "error_message",
-            "execution_time",
+    def get_schema(self):
+        # Add all audit-specific fields
+        return super().get_schema() + [
+            ("service_name", "service_name"),
+            ("request_type", "request_type"),
+            ("protocol", "protocol"),
+            ("request_repr", "request_repr"),
+            ("response_repr", "response_repr"),
+            ("error_message", "error_message"),
+            ("execution_time", "execution_time"),
         ]
 
-        for field in audit_fields:
-            log_data[field] = getattr(record, field)
-
-        return json.dumps(log_data)
-
 
-class AuditFormatter(logging.Formatter):
-    def __init__(self, timestamp_format: str = "%Y-%m-%d %H:%M:%S.%f"):
-        super().__init__()
-        self.timestamp_format = timestamp_format
-
-    def format(self, record):
-        log_data = {
-            "timestamp": datetime.datetime.fromtimestamp(
-                record.created
-            ).strftime(self.timestamp_format)[:-3],
-            "level": record.levelname,
-            "name": record.name,
-            "message": record.getMessage(),
-        }
-
-        audit_fields = [
-            "model",
-            "event_type",
-            "instance_id",
-            "user",
-            "extra",
+class AuditFormatter(EasyFormatter):
+    def get_schema(self):
+        return super().get_schema() + [
+            ("model", "model"),
+            ("event_type", "event_type"),
+            ("instance_id", "instance_id"),
+            ("user", "user"),
+            ("extra", "extra"),
         ]
-
-        for field in audit_fields:
-            log_data[field] = getattr(record, field)
-
-        return json.dumps(log_data)
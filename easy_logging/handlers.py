@@ -1,11 +1,96 @@
+import codecs
 import logging
+import os
+import queue
+import threading
+import time
+import weakref
 from logging.handlers import RotatingFileHandler
+from .constants import FSYNC_POLICIES, OVERFLOW_POLICIES
 from .formatter import APIFormatter, AuditFormatter
 from .logger_level import API, AUDIT
+from .rotation import SegmentRotator
+from .shards import shard_filename
+from .stats import register
+
+# Sentinel put on the queue to stop the background writer
+_STOP = object()
+
+
+def call_after_fork(method):
+    """Call ``method`` in forked child processes while its object is alive."""
+    if not hasattr(os, "register_at_fork"):  # pragma: no cover - Windows
+        return
+    ref = weakref.WeakMethod(method)
+
+    def after_in_child():
+        method = ref()
+        if method is not None:
+            method()
+
+    os.register_at_fork(after_in_child=after_in_child)
+
+
+def log_batch(logger: logging.Logger, level: int, entries) -> None:
+    """
+    Log several (message, extra) entries at once: every handler on the path
+    of ``logger`` gets them as one list through its ``handle_batch``, other
+    handlers one by one through ``handle``.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    records = []
+    for message, extra in entries:
+        record = logger.makeRecord(
+            logger.name,
+            level,
+            "(unknown file)",
+            0,
+            message,
+            (),
+            None,
+            extra=extra,
+        )
+        if logger.filter(record):
+            records.append(record)
+
+    current = logger
+    while current and records:
+        for handler in current.handlers:
+            batch = [r for r in records if r.levelno >= handler.level]
+            if not batch:
+                continue
+            if hasattr(handler, "handle_batch"):
+                handler.handle_batch(batch)
+            else:
+                for record in batch:
+                    handler.handle(record)
+        if not current.propagate:
+            break
+        current = current.parent
 
 
 class EasyLogHandler(RotatingFileHandler):
-    """Custom handler for audit.request logger that ensures proper formatting and validation of audit logs."""
+    """
+    Custom handler for audit.request logger that ensures proper formatting and validation of audit logs.
+
+    Records are written through ``write_batch``: a batch is formatted, checked
+    for rotation once and written with a single ``write()`` call. ``fsync``
+    sets the durability guarantee: "never" leaves it to the OS, "batch" syncs
+    after every write and "interval" syncs at most every ``fsync_interval``
+    seconds.
+
+    With ``compress`` ("none", "gzip" or "zstd") or ``max_age`` set, the file
+    rotates into timestamped segments instead of numbered backups: after
+    ``maxBytes`` bytes or ``max_age`` seconds, whichever comes first.
+    Rotation is then two renames; compression and cleanup of old segments
+    run on a background thread (see ``SegmentRotator``).
+
+    With ``shard`` set, every process writes (and rotates) its own file,
+    "api.log" becoming "api.<pid>.log", so worker processes never share a
+    file; a process forked after configuration switches to its own shard.
+    ``easy_logging.shards.merge_lines`` reads them back in order.
+    """
 
     def __init__(
         self,
@@ -15,8 +100,34 @@ class EasyLogHandler(RotatingFileHandler):
         backupCount=0,
         encoding=None,
         delay=False,
+        fsync=FSYNC_POLICIES[0],
+        fsync_interval=1.0,
+        max_age=0,
+        compress=None,
+        shard=False,
     ):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(
+                f"fsync must be one of {FSYNC_POLICIES}, got {fsync!r}"
+            )
+        self.shard_of = os.path.abspath(filename) if shard else None
+        self._shard_pid = os.getpid()
+        if shard:
+            filename = shard_filename(self.shard_of, self._shard_pid)
         super().__init__(filename, mode, maxBytes, backupCount, encoding, delay)
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self._last_fsync = time.monotonic()
+        self._unsynced = False
+        self.max_age = max_age
+        self.rollover_at = time.time() + max_age
+        self.compress = compress
+        self.rotator = None
+        register(self)
+        if compress is not None or max_age:
+            self.start_rotator()
+        if shard:
+            call_after_fork(self.reopen_shard)
         if self.level == API:
             self.setFormatter(APIFormatter())
         elif self.level == AUDIT:
@@ -25,19 +136,429 @@ class EasyLogHandler(RotatingFileHandler):
             print("*" * 50)
             self.setFormatter(AuditFormatter())
 
+    def start_rotator(self):
+        self.rotator = SegmentRotator(
+            self.baseFilename,
+            self.open_segment,
+            self.compress or "none",
+            self.backupCount,
+        )
+
+    def reopen_shard(self):
+        """Move a forked child process to its own shard file."""
+        if self._shard_pid == os.getpid():
+            return
+        self._shard_pid = os.getpid()
+        stream, self.stream = self.stream, None
+        if stream is not None:
+            # Closes this process's descriptor only; every write is flushed
+            stream.close()
+        self.baseFilename = shard_filename(self.shard_of, self._shard_pid)
+        self.rollover_at = time.time() + self.max_age
+        if self.rotator is not None:
+            # The parent's rotation thread does not exist in the child
+            self.start_rotator()
+
     def emit(self, record):
         """
         Emit a record with additional values for audit-specific fields.
         """
+        self.write_batch([record])
+
+    def handle_batch(self, records):
+        """Filter the records and write the rest as one batch."""
+        records = [record for record in records if self.filter(record)]
+        if records:
+            with self.lock:
+                self.write_batch(records)
+
+    def prepare_record(self, record):
+        # Handle extra if present
+        if hasattr(record, "extra"):
+            for key, value in record.extra.items():
+                setattr(record, key, value)
+
+    def write_batch(self, records):
+        """Format the records and write them with a single write() call."""
         try:
-            # Handle extra if present
-            if hasattr(record, "extra"):
-                for key, value in record.extra.items():
-                    setattr(record, key, value)
+            if self.stream is None:
+                self.stream = self._open()
+        except Exception as e:
+            self.report_error(records[-1], e)
+            return
+
+        # Formatters with format_bytes() skip the str -> bytes round trip
+        binary = self.writes_bytes()
+        if binary:
+            format_line = self.formatter.format_bytes
+            terminator = self.terminator.encode("utf-8")
+        else:
+            format_line = self.format
+            terminator = self.terminator
+
+        started = time.perf_counter()
+        lines = []
+        for record in records:
+            try:
+                self.prepare_record(record)
+                lines.append(format_line(record) + terminator)
+            except Exception as e:
+                self.report_error(record, e)
+        if not lines:
+            return
+
+        data = terminator[:0].join(lines)
+        formatted = time.perf_counter()
+        try:
+            if self.should_rollover_batch(len(data)):
+                if self.fsync != FSYNC_POLICIES[0]:
+                    self.sync()
+                self.doRollover()
+            if binary:
+                # The text layer is always flushed after a write, so bytes
+                # can go straight to the underlying buffer.
+                self.stream.buffer.write(data)
+            else:
+                self.stream.write(data)
+            self.stream.flush()
+            self._unsynced = True
+            if self.fsync == FSYNC_POLICIES[1]:
+                self.sync()
+            elif self.fsync == FSYNC_POLICIES[2]:
+                self.sync_if_due()
+        except Exception as e:
+            self.report_error(records[-1], e)
+            return
+        self.metrics.add_batch(
+            records,
+            formatted - started,
+            time.perf_counter() - formatted,
+            # Characters rather than bytes for formatters without format_bytes
+            len(data),
+        )
+
+    def writes_bytes(self) -> bool:
+        if not hasattr(self.formatter, "format_bytes"):
+            return False
+        encoding = getattr(self.stream, "encoding", None)
+        return (
+            encoding is not None
+            and hasattr(self.stream, "buffer")
+            and codecs.lookup(encoding).name == "utf-8"
+        )
+
+    def should_rollover_batch(self, size):
+        """
+        Check rotation once per batch from the current file position instead
+        of formatting every record a second time like shouldRollover().
+        """
+        if self.maxBytes <= 0 and not self.max_age:
+            return False
+        self.stream.seek(0, 2)  # due to non-posix-compliant Windows feature
+        position = self.stream.tell()
+        if position == 0:
+            return False
+        if self.max_age and time.time() >= self.rollover_at:
+            return True
+        return self.maxBytes > 0 and position + size >= self.maxBytes
+
+    def open_segment(self, path):
+        return open(
+            path,
+            "a",
+            encoding=self.encoding,
+            errors=getattr(self, "errors", None),
+        )
+
+    def doRollover(self):
+        self.metrics.add_rotation()
+        if self.rotator is None:
+            super().doRollover()
+            return
+        stream, self.stream = self.stream, None
+        self.stream = self.rotator.rotate(stream)
+        self.rollover_at = time.time() + self.max_age
+
+    def sync(self):
+        """Force written records to disk."""
+        if self.stream is not None and self._unsynced:
+            os.fsync(self.stream.fileno())
+        self._unsynced = False
+        self._last_fsync = time.monotonic()
+
+    def sync_if_due(self):
+        if time.monotonic() - self._last_fsync >= self.fsync_interval:
+            self.sync()
+
+    def report_error(self, record, error):
+        self.metrics.add_error(error)
+        self.handleError(record)
+        # Log the error to the root logger
+        logging.getLogger().error(f"Error in AuditLogHandler: {str(error)}")
+
+    def close(self):
+        self.acquire()
+        try:
+            if self.fsync != FSYNC_POLICIES[0]:
+                try:
+                    self.sync()
+                except (OSError, ValueError):
+                    pass
+        finally:
+            self.release()
+        super().close()
+        if self.rotator is not None:
+            self.rotator.close()
+
+
+class QueueWriterMixin:
+    """
+    Moves formatting and writing off the calling thread.
+
+    Callers only put the record on a bounded queue; a background writer
+    drains it in batches of up to ``batch_size`` records, waiting at most
+    ``batch_interval`` milliseconds for a batch to fill, and passes each
+    batch to ``write_records``. When the queue is full, ``overflow`` decides
+    whether the caller waits ("block"), the oldest queued record is discarded
+    ("drop_oldest") or the new record is discarded ("drop_newest").
+    Discarded records are counted in ``dropped``.
+
+    While the queue is empty the writer wakes up every ``idle_timeout()``
+    seconds (never if None) to run ``on_idle``.
+    """
+
+    def start_writer(
+        self,
+        queue_size=10000,
+        overflow=OVERFLOW_POLICIES[0],
+        batch_size=500,
+        batch_interval=0,
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"overflow must be one of {OVERFLOW_POLICIES}, got {overflow!r}"
+            )
+        self.queue = queue.Queue(queue_size)
+        self.overflow = overflow
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval / 1000
+        self.dropped = 0
+        self.blocked = 0
+        self._counter_lock = threading.Lock()
+        self._closed = False
+        self._writer = threading.Thread(
+            target=self._drain, name="easy-logging-writer", daemon=True
+        )
+        self._writer.start()
+        call_after_fork(self.restart_writer)
+
+    def restart_writer(self):
+        """
+        Start a new writer in a forked child: threads do not survive fork(),
+        and records still queued belong to the parent, which writes them.
+        """
+        if self._closed:
+            return
+        self.queue = queue.Queue(self.queue.maxsize)
+        self._counter_lock = threading.Lock()
+        self.dropped = 0
+        self.blocked = 0
+        self._writer = threading.Thread(
+            target=self._drain, name="easy-logging-writer", daemon=True
+        )
+        self._writer.start()
+
+    def handle(self, record):
+        """
+        Filter and enqueue the record without taking the handler lock, so a
+        caller blocked on a full queue never holds it.
+        """
+        rv = self.filter(record)
+        if isinstance(rv, logging.LogRecord):
+            record = rv
+        if rv:
+            self.emit(record)
+        return rv
+
+    def handle_batch(self, records):
+        """Filter and enqueue the records; the writer batches them again."""
+        for record in records:
+            self.handle(record)
 
-            super().emit(record)
+    def prepare(self, record):
+        """
+        Resolve the message now, so later changes to the arguments do not
+        leak into the log line.
+        """
+        record.msg = record.getMessage()
+        record.args = None
+        return record
 
+    def emit(self, record):
+        try:
+            self.enqueue(self.prepare(record))
         except Exception as e:
+            self.metrics.add_error(e)
             self.handleError(record)
-            # Log the error to the root logger
-            logging.getLogger().error(f"Error in AuditLogHandler: {str(e)}")
+
+    def enqueue(self, record):
+        if self.overflow == OVERFLOW_POLICIES[0]:
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                with self._counter_lock:
+                    self.blocked += 1
+                self.queue.put(record)
+        elif self.overflow == OVERFLOW_POLICIES[1]:
+            while True:
+                try:
+                    self.queue.put_nowait(record)
+                    return
+                except queue.Full:
+                    try:
+                        self.queue.get_nowait()
+                        self.queue.task_done()
+                    except queue.Empty:
+                        continue
+                    with self._counter_lock:
+                        self.dropped += 1
+        else:
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                with self._counter_lock:
+                    self.dropped += 1
+
+    def idle_timeout(self):
+        return None
+
+    def on_idle(self):
+        pass
+
+    def _drain(self):
+        q = self.queue
+        while True:
+            try:
+                batch = [q.get(timeout=self.idle_timeout())]
+            except queue.Empty:
+                self.on_idle()
+                continue
+
+            deadline = time.monotonic() + self.batch_interval
+            while len(batch) < self.batch_size:
+                try:
+                    remaining = deadline - time.monotonic()
+                    if remaining > 0:
+                        batch.append(q.get(timeout=remaining))
+                    else:
+                        batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+                if batch[-1] is _STOP:
+                    break
+
+            stop = False
+            records = []
+            for item in batch:
+                if item is _STOP:
+                    stop = True
+                else:
+                    records.append(item)
+
+            try:
+                self.write_records(records)
+            finally:
+                for _ in batch:
+                    q.task_done()
+            if stop:
+                return
+
+    def write_records(self, records):
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.queue.qsize(),
+            "queue_size": self.queue.maxsize,
+            "overflow": self.overflow,
+            "dropped": self.dropped,
+            "blocked": self.blocked,
+        }
+
+    def flush(self):
+        """Wait until every queued record has been written, then flush."""
+        writer = self._writer
+        if writer.is_alive() and threading.current_thread() is not writer:
+            self.queue.join()
+        super().flush()
+
+    def close(self):
+        """Drain the queue, stop the writer and close the handler."""
+        if not self._closed:
+            self._closed = True
+            if self._writer.is_alive():
+                self.queue.put(_STOP)
+                self._writer.join()
+        super().close()
+
+
+class QueuedEasyLogHandler(QueueWriterMixin, EasyLogHandler):
+    """
+    EasyLogHandler that moves formatting, writing and rotation off the
+    calling thread (see ``QueueWriterMixin``).
+    """
+
+    def __init__(
+        self,
+        filename,
+        mode="a",
+        maxBytes=0,
+        backupCount=0,
+        encoding=None,
+        delay=False,
+        fsync=FSYNC_POLICIES[0],
+        fsync_interval=1.0,
+        queue_size=10000,
+        overflow=OVERFLOW_POLICIES[0],
+        batch_size=500,
+        batch_interval=0,
+        max_age=0,
+        compress=None,
+        shard=False,
+    ):
+        super().__init__(
+            filename,
+            mode,
+            maxBytes,
+            backupCount,
+            encoding,
+            delay,
+            fsync,
+            fsync_interval,
+            max_age,
+            compress,
+            shard,
+        )
+        # The writer does not use the handler lock: logging.shutdown() holds
+        # it while calling flush(), which waits for the writer.
+        self._write_lock = threading.Lock()
+        self.start_writer(queue_size, overflow, batch_size, batch_interval)
+
+    def restart_writer(self):
+        self._write_lock = threading.Lock()
+        super().restart_writer()
+
+    def idle_timeout(self):
+        # Wake up while idle so "interval" fsync also covers the last batch
+        if self.fsync == FSYNC_POLICIES[2]:
+            return self.fsync_interval
+        return None
+
+    def on_idle(self):
+        with self._write_lock:
+            self.sync_if_due()
+
+    def write_records(self, records):
+        """Write a batch of records from the writer thread."""
+        with self._write_lock:
+            self.write_batch(records)
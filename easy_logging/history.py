@@ -0,0 +1,419 @@
+import datetime
+import json
+import logging
+import mmap
+import os
+import sqlite3
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from .rotation import COMPRESSED_SUFFIXES
+from .shards import list_log_files
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+loads = orjson.loads if orjson is not None else json.loads
+
+# Bulk events name one instance_id but change every id in extra.instance_ids
+BULK_EVENT_TYPES = ("BULK_CREATE", "BULK_UPDATE")
+
+# Compressed segments are read in pieces of this size while indexing
+READ_SIZE = 1024 * 1024
+
+# Decompressed blocks (about 1 MB each) a lookup keeps in memory
+BLOCK_CACHE_SIZE = 16
+
+# Times an update lists the files again when one disappears while indexed
+UPDATE_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    inode INTEGER NOT NULL,
+    compression TEXT NOT NULL,
+    indexed_offset INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    model TEXT NOT NULL,
+    instance_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    file_id INTEGER NOT NULL,
+    block_offset INTEGER NOT NULL,
+    block_length INTEGER NOT NULL,
+    line_offset INTEGER NOT NULL,
+    line_length INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_instance
+    ON entries (model, instance_id, timestamp);
+CREATE INDEX IF NOT EXISTS entries_timestamp ON entries (timestamp);
+CREATE INDEX IF NOT EXISTS entries_file ON entries (file_id);
+"""
+
+Timestamp = Union[str, datetime.datetime, datetime.date, None]
+
+
+def get_compression(path: str) -> str:
+    for compression, suffix in COMPRESSED_SUFFIXES.items():
+        if path.endswith(suffix):
+            return compression
+    return "none"
+
+
+def get_decompressor(compression: str):
+    if compression == "gzip":
+        return zlib.decompressobj(wbits=31)
+    if zstandard is None:
+        raise ImportError("zstandard is not installed")
+    return zstandard.ZstdDecompressor().decompressobj()
+
+
+def iter_members(file, compression: str) -> Iterator[Tuple[int, int, bytes]]:
+    """
+    Yield (offset, length, data) for every gzip member / zstd frame of a
+    compressed segment, as written by ``SegmentRotator``.
+    """
+    offset = 0
+    pending = b""
+    while True:
+        decompressor = get_decompressor(compression)
+        parts = []
+        consumed = 0
+        data = pending
+        while True:
+            if not data:
+                data = file.read(READ_SIZE)
+                if not data:
+                    if parts:
+                        raise EOFError("Truncated compressed segment")
+                    return
+            consumed += len(data)
+            parts.append(decompressor.decompress(data))
+            data = b""
+            if decompressor.eof:
+                pending = decompressor.unused_data
+                consumed -= len(pending)
+                break
+        yield offset, consumed, b"".join(parts)
+        offset += consumed
+
+
+def format_bound(value: Timestamp) -> Optional[str]:
+    """Render a time bound the way ``EasyFormatter`` renders timestamps."""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, datetime.datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+    return value.strftime("%Y-%m-%d")
+
+
+class AuditHistory:
+    """
+    Sidecar index over an audit log and its rotated segments.
+
+    Every ``AuditFormatter`` line is indexed by (model, instance_id) and by
+    timestamp; bulk events are indexed under each id in
+    ``extra.instance_ids``. An entry points at the line's byte range: in the
+    file itself, or inside one gzip member / zstd frame of a compressed
+    segment. Lookups read only those ranges through ``mmap``.
+
+    ``update`` is incremental: the live file is indexed from where the
+    previous update stopped, a renamed file keeps its entries (it is found
+    by inode) and only new or replaced segments are read in full.
+    Timestamps are compared as strings, so the formatter must use the
+    default ``timestamp_format``.
+    """
+
+    def __init__(self, filename: str, index_path: Optional[str] = None):
+        self.filename = os.path.abspath(filename)
+        self.index_path = index_path or f"{self.filename}.idx"
+        self.db = sqlite3.connect(self.index_path)
+        self.db.executescript(SCHEMA)
+
+    def paths(self) -> List[str]:
+        # Includes the per-process shards of a sharded handler
+        return [
+            path for files in list_log_files(self.filename) for path in files
+        ]
+
+    def update(self) -> int:
+        """Index lines written since the last update; returns their number."""
+        indexed = 0
+        for _ in range(UPDATE_ATTEMPTS):
+            count, complete = self.update_once()
+            indexed += count
+            if complete:
+                break
+        return indexed
+
+    def update_once(self) -> Tuple[int, bool]:
+        """
+        One indexing pass. Returns False as well when a file disappeared
+        while it was read (the background compressor replaced it), so the
+        files need to be listed again.
+        """
+        complete = True
+        on_disk: Dict[str, os.stat_result] = {}
+        for path in self.paths():
+            try:
+                on_disk[path] = os.stat(path)
+            except OSError:
+                pass
+        by_inode = {stat.st_ino: path for path, stat in on_disk.items()}
+
+        indexed = 0
+        with self.db:
+            rows = self.db.execute(
+                "SELECT id, path, inode, compression, indexed_offset FROM files"
+            ).fetchall()
+            files = {}
+            for file_id, path, inode, compression, offset in rows:
+                stat = on_disk.get(path)
+                if (
+                    stat is not None
+                    and stat.st_ino == inode
+                    and stat.st_size >= offset
+                    and path not in files
+                ):
+                    files[path] = (file_id, compression, offset)
+                    continue
+                # Rotated or renamed: follow the file to its new name
+                moved = by_inode.get(inode)
+                if (
+                    compression == "none"
+                    and moved is not None
+                    and moved != path
+                    and moved not in files
+                    and get_compression(moved) == "none"
+                    and on_disk[moved].st_size >= offset
+                ):
+                    self.db.execute(
+                        "UPDATE files SET path = ? WHERE id = ?",
+                        (moved, file_id),
+                    )
+                    files[moved] = (file_id, compression, offset)
+                    continue
+                self.db.execute(
+                    "DELETE FROM entries WHERE file_id = ?", (file_id,)
+                )
+                self.db.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+            for path, stat in on_disk.items():
+                if path not in files:
+                    compression = get_compression(path)
+                    cursor = self.db.execute(
+                        "INSERT INTO files"
+                        " (path, inode, compression, indexed_offset)"
+                        " VALUES (?, ?, ?, 0)",
+                        (path, stat.st_ino, compression),
+                    )
+                    files[path] = (cursor.lastrowid, compression, 0)
+
+            for path, (file_id, compression, offset) in files.items():
+                if offset >= on_disk[path].st_size:
+                    continue
+                try:
+                    if compression == "none":
+                        entries, offset = self.index_plain(
+                            path, file_id, offset
+                        )
+                    else:
+                        entries, offset = self.index_compressed(
+                            path, file_id, compression
+                        )
+                except FileNotFoundError:
+                    complete = False
+                    self.db.execute(
+                        "DELETE FROM entries WHERE file_id = ?", (file_id,)
+                    )
+                    self.db.execute(
+                        "DELETE FROM files WHERE id = ?", (file_id,)
+                    )
+                    continue
+                self.db.executemany(
+                    "INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    entries,
+                )
+                self.db.execute(
+                    "UPDATE files SET indexed_offset = ? WHERE id = ?",
+                    (offset, file_id),
+                )
+                indexed += len(entries)
+        return indexed, complete
+
+    def get_entries(
+        self, line: bytes, file_id, block_offset, block_length, line_offset
+    ) -> List[tuple]:
+        try:
+            record = loads(line)
+            model = record["model"]
+            instance_ids = [record["instance_id"]]
+            timestamp = record["timestamp"]
+        except (ValueError, KeyError, TypeError):
+            # Not an audit record
+            return []
+        if record.get("event_type") in BULK_EVENT_TYPES:
+            extra = record.get("extra") or {}
+            instance_ids = extra.get("instance_ids") or instance_ids
+        return [
+            (
+                model,
+                str(instance_id),
+                timestamp,
+                file_id,
+                block_offset,
+                block_length,
+                line_offset,
+                len(line),
+            )
+            for instance_id in dict.fromkeys(instance_ids)
+        ]
+
+    def index_plain(self, path, file_id, offset) -> Tuple[List[tuple], int]:
+        entries = []
+        with open(path, "rb") as file:
+            file.seek(offset)
+            for line in file:
+                if not line.endswith(b"\n"):
+                    # Still being written; picked up by the next update
+                    break
+                entries.extend(self.get_entries(line, file_id, -1, 0, offset))
+                offset += len(line)
+        return entries, offset
+
+    def index_compressed(
+        self, path, file_id, compression
+    ) -> Tuple[List[tuple], int]:
+        entries = []
+        with open(path, "rb") as file:
+            for block_offset, block_length, data in iter_members(
+                file, compression
+            ):
+                line_offset = 0
+                for line in data.splitlines(keepends=True):
+                    entries.extend(
+                        self.get_entries(
+                            line,
+                            file_id,
+                            block_offset,
+                            block_length,
+                            line_offset,
+                        )
+                    )
+                    line_offset += len(line)
+            return entries, file.tell()
+
+    def lookup(
+        self,
+        model: Optional[str] = None,
+        instance_id=None,
+        since: Timestamp = None,
+        until: Timestamp = None,
+        limit: Optional[int] = None,
+        refresh: bool = True,
+    ) -> List[dict]:
+        """
+        Audit records of ``model`` (and ``instance_id``) between ``since``
+        and ``until``, oldest first. ``until`` is exclusive.
+        """
+        if refresh:
+            self.update()
+
+        conditions, params = [], []
+        if model is not None:
+            conditions.append("e.model = ?")
+            params.append(model)
+        if instance_id is not None:
+            conditions.append("e.instance_id = ?")
+            params.append(str(instance_id))
+        if since is not None:
+            conditions.append("e.timestamp >= ?")
+            params.append(format_bound(since))
+        if until is not None:
+            conditions.append("e.timestamp < ?")
+            params.append(format_bound(until))
+        query = (
+            "SELECT DISTINCT e.timestamp, f.path, f.compression,"
+            " e.block_offset, e.block_length, e.line_offset, e.line_length"
+            " FROM entries e JOIN files f ON f.id = e.file_id"
+        )
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY e.timestamp, f.id, e.block_offset, e.line_offset"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        try:
+            lines = list(self.read_lines(self.db.execute(query, params)))
+        except FileNotFoundError:
+            # A segment was compressed after it was indexed
+            self.update()
+            lines = list(self.read_lines(self.db.execute(query, params)))
+        return [loads(line) for line in lines]
+
+    def read_lines(self, rows) -> Iterator[bytes]:
+        maps: Dict[str, mmap.mmap] = {}
+        blocks: "OrderedDict[Tuple[str, int], bytes]" = OrderedDict()
+        try:
+            for (
+                _,
+                path,
+                compression,
+                block_offset,
+                block_length,
+                line_offset,
+                line_length,
+            ) in rows:
+                mapped = maps.get(path)
+                if mapped is None:
+                    with open(path, "rb") as file:
+                        mapped = mmap.mmap(
+                            file.fileno(), 0, access=mmap.ACCESS_READ
+                        )
+                    maps[path] = mapped
+                if compression == "none":
+                    yield mapped[line_offset : line_offset + line_length]
+                    continue
+                block = blocks.get((path, block_offset))
+                if block is None:
+                    block = get_decompressor(compression).decompress(
+                        mapped[block_offset : block_offset + block_length]
+                    )
+                    blocks[(path, block_offset)] = block
+                    if len(blocks) > BLOCK_CACHE_SIZE:
+                        blocks.popitem(last=False)
+                else:
+                    blocks.move_to_end((path, block_offset))
+                yield block[line_offset : line_offset + line_length]
+        finally:
+            for mapped in maps.values():
+                mapped.close()
+
+    def close(self) -> None:
+        self.db.close()
+
+
+def get_audit_log_file() -> str:
+    """
+    The audit log: ``DJANGO_EASY_AUDIT_LOG_FILE``, otherwise the file of the
+    first file handler of the "easy.crud" logger.
+    """
+    from .settings import AUDIT_LOG_FILE
+
+    if AUDIT_LOG_FILE:
+        return AUDIT_LOG_FILE
+    for handler in logging.getLogger("easy.crud").handlers:
+        filename = getattr(handler, "baseFilename", None)
+        if filename:
+            return filename
+    return "easy_logs/audit.log"
@@ -0,0 +1,49 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from easy_logging.history import AuditHistory, get_audit_log_file
+
+
+class Command(BaseCommand):
+    help = (
+        "Show the audit records of a model or model instance from the audit "
+        "log and its rotated segments, using (and updating) a sidecar index."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", nargs="?", help="Model name, e.g. Patient")
+        parser.add_argument("instance_id", nargs="?", help="Primary key")
+        parser.add_argument(
+            "--file", help="Audit log file (default: the easy.crud handler)"
+        )
+        parser.add_argument("--index", help="Index file (default: <file>.idx)")
+        parser.add_argument("--since", help='e.g. "2024-01-31 12:00"')
+        parser.add_argument("--until", help="Exclusive upper bound")
+        parser.add_argument("--limit", type=int)
+        parser.add_argument(
+            "--update-only",
+            action="store_true",
+            help="Only bring the index up to date",
+        )
+
+    def handle(self, *args, **options):
+        history = AuditHistory(
+            options["file"] or get_audit_log_file(), options["index"]
+        )
+        try:
+            indexed = history.update()
+            if options["update_only"]:
+                self.stdout.write(f"Indexed {indexed} new entries")
+                return
+            for record in history.lookup(
+                model=options["model"],
+                instance_id=options["instance_id"],
+                since=options["since"],
+                until=options["until"],
+                limit=options["limit"],
+                refresh=False,
+            ):
+                self.stdout.write(json.dumps(record))
+        finally:
+            history.close()
@@ -0,0 +1,67 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from easy_logging.settings import STATS_FILE
+from easy_logging.stats import get_stats, read_snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Show the counters of the logging pipeline: records per logger, "
+        "formatting and write time, bytes, rotations, errors and queues."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file",
+            help="Stats file of the running processes "
+            "(default: DJANGO_EASY_AUDIT_STATS_FILE)",
+        )
+        parser.add_argument("--json", action="store_true", help="Raw JSON")
+
+    def handle(self, *args, **options):
+        filename = options["file"] or STATS_FILE
+        if filename:
+            snapshots = read_snapshots(filename)
+        else:
+            # Without a stats file only this process can be inspected
+            snapshots = [get_stats()]
+
+        if options["json"]:
+            self.stdout.write(json.dumps(snapshots, indent=2))
+            return
+        if not snapshots:
+            self.stdout.write(f"No stats written to {filename} yet")
+            return
+        for stats in snapshots:
+            self.write_snapshot(stats)
+
+    def write_snapshot(self, stats):
+        age = time.time() - stats["timestamp"]
+        self.stdout.write(
+            f"Process {stats['pid']} (up {stats['uptime']:.0f}s, "
+            f"updated {age:.0f}s ago)"
+        )
+        for name, count in sorted(stats["loggers"].items()):
+            self.stdout.write(f"  {name}: {count} records")
+        for name, handler in stats["handlers"].items():
+            format_us = handler["format_time"] / (handler["records"] or 1) * 1e6
+            write_us = handler["write_time"] / (handler["batches"] or 1) * 1e6
+            line = (
+                f"  {name}: {handler['records']} records, "
+                f"{handler['bytes']} bytes, "
+                f"format {format_us:.1f} us/record, "
+                f"write {write_us:.1f} us/batch, "
+                f"{handler['rotations']} rotations, {handler['errors']} errors"
+            )
+            if "queue_depth" in handler:
+                line += (
+                    f", queue {handler['queue_depth']}/{handler['queue_size']}"
+                    f", {handler['dropped']} dropped"
+                    f", {handler['blocked']} blocked"
+                )
+            self.stdout.write(line)
+            if handler["last_error"]:
+                self.stdout.write(f"    last error: {handler['last_error']}")
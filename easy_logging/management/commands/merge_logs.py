@@ -0,0 +1,28 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from easy_logging.shards import merge_lines
+
+
+class Command(BaseCommand):
+    help = (
+        "Merge a log file with its per-process shards and rotated segments "
+        "into one stream ordered by timestamp."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("filename", help="e.g. easy_logs/api.log")
+        parser.add_argument("--output", help="File to write (default: stdout)")
+        parser.add_argument("--since", help='e.g. "2024-01-31 12:00"')
+        parser.add_argument("--until", help="Exclusive upper bound")
+
+    def handle(self, *args, **options):
+        lines = merge_lines(
+            options["filename"], options["since"], options["until"]
+        )
+        if options["output"]:
+            with open(options["output"], "wb") as output:
+                output.writelines(lines)
+        else:
+            sys.stdout.buffer.writelines(lines)
@@ -1,19 +1,62 @@
 import time
 import logging
-import json
-import re
 import contextlib
 
 from asgiref.local import Local
-from django.http import HttpResponse
+from asgiref.sync import iscoroutinefunction, sync_to_async
 from django.utils.deprecation import MiddlewareMixin
-from .settings import UNREGISTERED_URLS, REGISTERED_URLS
+from .settings import (
+    UNREGISTERED_URLS,
+    REGISTERED_URLS,
+    UNREGISTERED_URL_NAMES,
+    REGISTERED_URL_NAMES,
+    UNREGISTERED_METHODS,
+    REGISTERED_METHODS,
+    URL_FILTER_CACHE_SIZE,
+    MAX_BODY_BYTES,
+    CAPTURE_CONTENT_TYPES,
+    SKIP_CONTENT_TYPES,
+    PARSE_BODIES,
+    SAMPLE_RATE,
+    SAMPLING_RULES,
+    SAMPLE_KEEP_STATUS,
+    SAMPLE_LATENCY_THRESHOLD,
+    TRACE_ID_HEADER,
+)
+from .capture import NOT_CAPTURED, BodyCapture
 from .constants import REQUEST_TYPES
+from .sampling import Sampler
+from .url_filter import URLFilter
 
 logger = logging.getLogger("easy.request")
 
 _thread_locals = Local()
 
+url_filter = URLFilter(
+    unregistered_urls=UNREGISTERED_URLS,
+    registered_urls=REGISTERED_URLS,
+    unregistered_names=UNREGISTERED_URL_NAMES,
+    registered_names=REGISTERED_URL_NAMES,
+    unregistered_methods=UNREGISTERED_METHODS,
+    registered_methods=REGISTERED_METHODS,
+    cache_size=URL_FILTER_CACHE_SIZE,
+)
+
+body_capture = BodyCapture(
+    max_bytes=MAX_BODY_BYTES,
+    content_types=CAPTURE_CONTENT_TYPES,
+    skip_content_types=SKIP_CONTENT_TYPES,
+    parse=PARSE_BODIES,
+)
+
+sampler = Sampler(
+    rate=SAMPLE_RATE,
+    rules=SAMPLING_RULES,
+    keep_status=SAMPLE_KEEP_STATUS,
+    latency_threshold=SAMPLE_LATENCY_THRESHOLD,
+    trace_id_header=TRACE_ID_HEADER,
+)
+
 
 class MockRequest:
     def __init__(self, *args, **kwargs):
@@ -37,6 +80,25 @@ def get_current_user():
     return None
 
 
+def get_current_actor(serializer) -> dict:
+    """
+    Serialized current user, computed once per request (or per
+    set_current_user() context) and cached on it.
+    """
+    request = get_current_request()
+    user = getattr(request, "user", None)
+    if user is None:
+        return {}
+
+    cached = getattr(request, "_easy_audit_actor", None)
+    if cached is not None and cached[0] is user:
+        return cached[1]
+
+    actor = serializer(user)
+    request._easy_audit_actor = (user, actor)
+    return actor
+
+
 def set_current_user(user):
     try:
         _thread_locals.request.user = user
@@ -50,23 +112,47 @@ def clear_request():
         del _thread_locals.request
 
 
-def should_log_url(url):
-    # check if current url is blacklisted
-    for unregistered_url in UNREGISTERED_URLS:
-        pattern = re.compile(unregistered_url)
-        if pattern.match(url):
-            return False
+def should_log_url(url, method=None, path_info=None):
+    return url_filter.should_log(url, method, path_info)
 
-    # only audit URLs listed in REGISTERED_URLS (if it's set)
-    if len(REGISTERED_URLS) > 0:
-        for registered_url in REGISTERED_URLS:
-            pattern = re.compile(registered_url)
-            if pattern.match(url):
-                return True
-        return False
 
-    # all good
-    return True
+class RequestLog:
+    """
+    Log data of a single request. One is created per call and never shared,
+    so concurrent requests cannot overwrite each other's data.
+    """
+
+    __slots__ = (
+        "request",
+        "service_name",
+        "start_time",
+        "sampled",
+        "protocol",
+        "request_repr",
+        "response_repr",
+        "execution_time",
+    )
+
+    def __init__(self, request, service_name: str):
+        self.request = request
+        self.service_name = service_name
+        self.start_time = time.time()
+        self.sampled = True
+        self.protocol = None
+        self.request_repr = None
+        self.response_repr = None
+        self.execution_time = 0
+
+    def as_extra(self) -> dict:
+        return {
+            "service_name": self.service_name,
+            "request_type": REQUEST_TYPES[0],
+            "protocol": self.protocol,
+            "request_repr": self.request_repr,
+            "response_repr": self.response_repr,
+            "error_message": None,
+            "execution_time": self.execution_time,
+        }
 
 
 class EasyLoggingMiddleware(MiddlewareMixin):
@@ -93,27 +179,13 @@ class EasyLoggingMiddleware(MiddlewareMixin):
     }
     """
 
-    def __init__(self, get_response):
-        self.get_response = get_response
-        self.log_data = {
-            "service_name": "review_board",
-            "request_type": REQUEST_TYPES[0],
-            "protocol": None,
-            "request_repr": {},
-            "response_repr": {},
-            "error_message": None,
-            "execution_time": 0,
-        }
+    service_name = "review_board"
 
-    def __call__(self, request):
-        set_current_request(request)
-
-        if not should_log_url(request.path):
-            return self.get_response(request)
-
-        start_time = time.time()
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.is_async = iscoroutinefunction(get_response)
 
-        # Log request
+    def get_request_data(self, request) -> dict:
         request_data = {
             "method": request.method,
             "path": request.path,
@@ -124,99 +196,93 @@ class EasyLoggingMiddleware(MiddlewareMixin):
             else None,
         }
 
-        if request.content_type == "application/json":
-            try:
-                body = json.loads(request.body)
-                request_data["body"] = body
-            except json.JSONDecodeError:
-                request_data["body"] = "Invalid JSON"
+        body = body_capture.request_body(request)
+        if body is not NOT_CAPTURED:
+            request_data["body"] = body
 
-        # Get response
-        response = self.get_response(request)
-        end_time = time.time()
+        return request_data
 
-        # Log response
+    def get_response_data(self, response) -> dict:
         response_data = {
             "status_code": response.status_code,
             "headers": dict(response.headers),
         }
 
-        if isinstance(response, HttpResponse):
-            try:
-                content = response.content.decode("utf-8")
-                if content:
-                    try:
-                        response_data["body"] = json.loads(content)
-                    except json.JSONDecodeError:
-                        response_data["body"] = content
-            except UnicodeDecodeError:
-                response_data["body"] = "Binary content"
+        # Streaming and file responses are never read
+        body = body_capture.response_body(response)
+        if body is not NOT_CAPTURED:
+            response_data["body"] = body
 
-        self.log_data["execution_time"] = end_time - start_time
-        self.log_data["protocol"] = "https" if request.is_secure() else "http"
-        self.log_data["request_repr"] = request_data
-        self.log_data["response_repr"] = response_data
+        return response_data
 
-        logger.api("Audit Internal Request", extra=self.log_data)
+    def start(self, request) -> RequestLog:
+        log = RequestLog(request, self.service_name)
 
-        clear_request()
+        # Sampled-out requests skip body capture; they are only logged if
+        # they fail or are slow.
+        log.sampled = sampler.sample(request)
+        return log
 
-        return response
+    def should_write(self, log: RequestLog, response) -> bool:
+        log.execution_time = time.time() - log.start_time
+        return log.sampled or sampler.keep(
+            response.status_code, log.execution_time
+        )
 
-    async def __acall__(self, request):
-        set_current_request(request)
-
-        if not should_log_url(request.path):
-            return await self.get_response(request)
-
-        start_time = time.time()
-
-        # Log request
-        request_data = {
-            "method": request.method,
-            "path": request.path,
-            "query_params": dict(request.GET.items()),
-            "headers": dict(request.headers),
-            "user": str(request.user)
-            if request.user.is_authenticated
-            else None,
-        }
+    def write_log(self, log: RequestLog, response) -> None:
+        request = log.request
+        if log.request_repr is None:
+            log.request_repr = self.get_request_data(request)
+        log.response_repr = self.get_response_data(response)
+        log.protocol = "https" if request.is_secure() else "http"
 
-        if request.content_type == "application/json":
-            try:
-                body = json.loads(request.body)
-                request_data["body"] = body
-            except json.JSONDecodeError:
-                request_data["body"] = "Invalid JSON"
+        logger.api("Audit Internal Request", extra=log.as_extra())
 
-        # Get response
-        response = await self.get_response(request)
-        end_time = time.time()
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
 
-        # Log response
-        response_data = {
-            "status_code": response.status_code,
-            "headers": dict(response.headers),
-        }
+        set_current_request(request)
+        try:
+            if not should_log_url(
+                request.path, request.method, request.path_info
+            ):
+                return self.get_response(request)
 
-        if isinstance(response, HttpResponse):
-            try:
-                content = response.content.decode("utf-8")
-                if content:
-                    try:
-                        response_data["body"] = json.loads(content)
-                    except json.JSONDecodeError:
-                        response_data["body"] = content
-            except UnicodeDecodeError:
-                response_data["body"] = "Binary content"
+            log = self.start(request)
+            if log.sampled:
+                log.request_repr = self.get_request_data(request)
 
-        self.log_data["execution_time"] = end_time - start_time
-        self.log_data["protocol"] = "https" if request.is_secure() else "http"
-        self.log_data["request_repr"] = request_data
-        self.log_data["response_repr"] = response_data
+            # Get response
+            response = self.get_response(request)
 
-        logger.api("Audit Internal Request", extra=self.log_data)
+            if self.should_write(log, response):
+                self.write_log(log, response)
 
-        clear_request()
+            return response
+        finally:
+            clear_request()
 
-        return response
+    async def __acall__(self, request):
+        set_current_request(request)
+        try:
+            if not should_log_url(
+                request.path, request.method, request.path_info
+            ):
+                return await self.get_response(request)
+
+            log = self.start(request)
+
+            # Get response
+            response = await self.get_response(request)
+
+            # Body parsing, request.user and JSON encoding run in a worker
+            # thread instead of on the event loop
+            if self.should_write(log, response):
+                await sync_to_async(self.write_log, thread_sensitive=False)(
+                    log, response
+                )
+
+            return response
+        finally:
+            clear_request()
@@ -1,17 +1,48 @@
+import io
 import time
 import json
+import asyncio
 import paramiko
 import logging
 
-from typing import Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from asgiref.sync import sync_to_async
 from requests.sessions import Session
+from .capture import NOT_CAPTURED, BodyCapture
 from .constants import REQUEST_TYPES
+from .settings import (
+    MAX_BODY_BYTES,
+    CAPTURE_CONTENT_TYPES,
+    SKIP_CONTENT_TYPES,
+    PARSE_BODIES,
+    SFTP_POOL_MAX_SIZE,
+    SFTP_POOL_MAX_IDLE,
+    SFTP_PATH_CACHE_TTL,
+    SFTP_CHUNK_SIZE,
+    SFTP_MAX_CONCURRENT_REQUESTS,
+)
+from .sftp_pool import PooledConnection, SFTPConnectionPool
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
 
 logger = logging.getLogger("easy.request")
 
 PROTOCOLS = ("http", "sftp")
 OPERATIONS = ("upload", "download")
 THIRTY_SECONDS_TIMEOUT = 30
+MAX_CONNECTIONS = 100
+MAX_CONNECTIONS_PER_HOST = 10
+
+sftp_pool = SFTPConnectionPool(
+    max_size=SFTP_POOL_MAX_SIZE,
+    max_idle=SFTP_POOL_MAX_IDLE,
+    path_ttl=SFTP_PATH_CACHE_TTL,
+    timeout=THIRTY_SECONDS_TIMEOUT,
+)
 
 """
     log structure:
@@ -38,56 +69,242 @@ THIRTY_SECONDS_TIMEOUT = 30
 """
 
 
-class HTTPClient(Session):
-    def __init__(self, service_name: str = "default"):
-        super().__init__()
-        self.log_payload = {
-            "service_name": service_name,
+class HTTPLogMixin:
+    """
+    Builds the log record of an outgoing HTTP request. Every call gets its
+    own payload; bodies follow the ``body_capture`` limits and are never read
+    from streamed requests or responses.
+    """
+
+    body_capture = BodyCapture(
+        max_bytes=MAX_BODY_BYTES,
+        content_types=CAPTURE_CONTENT_TYPES,
+        skip_content_types=SKIP_CONTENT_TYPES,
+        parse=PARSE_BODIES,
+    )
+
+    def get_request_repr(self, method, url, kwargs) -> dict:
+        headers = dict(kwargs.get("headers") or {})
+        request_repr = {
+            "endpoint": str(url),
+            "method": method,
+            "headers": headers,
+        }
+
+        if kwargs.get("json") is not None:
+            request_repr["body"] = self.body_capture.structured_body(
+                kwargs["json"]
+            )
+            return request_repr
+
+        content_type = next(
+            (v for k, v in headers.items() if k.lower() == "content-type"),
+            "",
+        )
+        data = kwargs.get("data")
+        if data is None:
+            data = kwargs.get("content")
+        body = self.body_capture.client_request_body(data, content_type)
+        if body is not NOT_CAPTURED:
+            request_repr["body"] = body
+        return request_repr
+
+    def get_response_repr(self, response, stream: bool = False) -> dict:
+        response_repr = {"status_code": response.status_code}
+        body = self.body_capture.client_response_body(response, stream)
+        if body is not NOT_CAPTURED:
+            response_repr["body"] = body
+        return response_repr
+
+    def get_log_payload(
+        self, request_repr, response_repr, error, start_time
+    ) -> dict:
+        return {
+            "service_name": self.service_name,
             "protocol": PROTOCOLS[0],
             "request_type": REQUEST_TYPES[1],
-            "request_repr": {},
-            "response_repr": {},
-            "error_message": "",
-            "execution_time": 0,
+            "request_repr": request_repr,
+            "response_repr": response_repr,
+            "error_message": error,
+            "execution_time": time.time() - start_time,
         }
 
+
+class HTTPClient(HTTPLogMixin, Session):
+    def __init__(self, service_name: str = "default"):
+        super().__init__()
+        self.service_name = service_name
+
     def request(self, method, url, **kwargs):
         start_time = time.time()
-        headers = kwargs.get("headers", {})
-        data = kwargs.get("data", {})
+        request_repr = self.get_request_repr(method, url, kwargs)
+        response_repr = None
         error = None
         response = None
 
-        request_repr = {
-            "endpoint": url,
-            "method": method,
-            "headers": headers,
-            "body": data,
-        }
-
         try:
             response = super().request(method, url, **kwargs)
-            response_repr = {
-                "status_code": response.status_code,
-                "body": response.json(),
-            }
+            response_repr = self.get_response_repr(
+                response, kwargs.get("stream", False)
+            )
         except Exception as e:
             error = str(e)
 
-        execution_time = time.time() - start_time
+        logger.api(
+            "Audit External Service",
+            extra=self.get_log_payload(
+                request_repr, response_repr, error, start_time
+            ),
+        )
 
-        self.log_payload["request_repr"] = str(request_repr)
-        self.log_payload["execution_time"] = execution_time
+        return response
 
-        if error:
-            self.log_payload["error_message"] = error
-        else:
-            self.log_payload["response_repr"] = str(response_repr)
 
-        logger.api("Audit External Service", extra=self.log_payload)
+class AsyncHTTPClient(HTTPLogMixin):
+    """
+    asyncio counterpart of ``HTTPClient`` built on a pooled
+    ``httpx.AsyncClient``. Logs the same records; they are written from a
+    worker thread so a slow handler never blocks the event loop.
+
+    Extra keyword arguments go to ``httpx.AsyncClient``, e.g. ``base_url``
+    or ``transport`` to run against a local stand-in server.
+    """
+
+    def __init__(
+        self,
+        service_name: str = "default",
+        max_connections: int = MAX_CONNECTIONS,
+        max_connections_per_host: int = MAX_CONNECTIONS_PER_HOST,
+        timeout: float = THIRTY_SECONDS_TIMEOUT,
+        **client_kwargs,
+    ):
+        if httpx is None:
+            raise ImportError("httpx is not installed")
+
+        self.service_name = service_name
+        self.max_connections_per_host = max_connections_per_host
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            timeout=timeout,
+            **client_kwargs,
+        )
+        self._host_limits: Dict[
+            Tuple[str, str, Optional[int]], asyncio.Semaphore
+        ] = {}
+
+    def get_host_limit(self, url) -> asyncio.Semaphore:
+        url = httpx.URL(url)
+        if url.is_relative_url:
+            url = self.client.base_url.join(url)
+        key = (url.scheme, url.host, url.port)
+
+        semaphore = self._host_limits.get(key)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_connections_per_host)
+            self._host_limits[key] = semaphore
+        return semaphore
+
+    @staticmethod
+    def release_on_close(response, limit: asyncio.Semaphore) -> None:
+        """Keep the host slot of a streamed response until it is closed."""
+        aclose = response.aclose
+        released = False
+
+        async def aclose_and_release():
+            nonlocal released
+            try:
+                await aclose()
+            finally:
+                if not released:
+                    released = True
+                    limit.release()
+
+        response.aclose = aclose_and_release
+
+    async def request(self, method, url, stream: bool = False, **kwargs):
+        """
+        Send a request. With ``stream=True`` the body is not read; the
+        caller consumes it (e.g. ``response.aiter_bytes()``) and closes the
+        response with ``await response.aclose()``, which also frees its slot
+        in ``max_connections_per_host``.
+        """
+        start_time = time.time()
+        request_repr = self.get_request_repr(method, url, kwargs)
+        response_repr = None
+        error = None
+        response = None
+
+        send_kwargs = {
+            key: kwargs.pop(key)
+            for key in ("auth", "follow_redirects")
+            if key in kwargs
+        }
+
+        try:
+            limit = self.get_host_limit(url)
+            await limit.acquire()
+            try:
+                response = await self.client.send(
+                    self.client.build_request(method, url, **kwargs),
+                    stream=stream,
+                    **send_kwargs,
+                )
+            finally:
+                if stream and response is not None:
+                    self.release_on_close(response, limit)
+                else:
+                    limit.release()
+            response_repr = self.get_response_repr(response, stream)
+        except Exception as e:
+            error = str(e)
+
+        await sync_to_async(logger.api, thread_sensitive=False)(
+            "Audit External Service",
+            extra=self.get_log_payload(
+                request_repr, response_repr, error, start_time
+            ),
+        )
 
         return response
 
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url, **kwargs):
+        return await self.request("PUT", url, **kwargs)
+
+    async def patch(self, url, **kwargs):
+        return await self.request("PATCH", url, **kwargs)
+
+    async def delete(self, url, **kwargs):
+        return await self.request("DELETE", url, **kwargs)
+
+    async def gather(self, requests: Iterable[dict]) -> List:
+        """
+        Send many requests concurrently, e.g.
+        ``[{"method": "GET", "url": "/a"}, {"method": "POST", "url": "/b",
+        "json": {...}}]``. Responses are returned in the same order; failed
+        requests give ``None``, like ``request``.
+        """
+        return await asyncio.gather(
+            *(self.request(**request) for request in requests)
+        )
+
+    async def close(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
 
 class SFTPClient:
     def __init__(
@@ -97,54 +314,56 @@ class SFTPClient:
         username,
         password,
         service_name,
+        pool: Optional[SFTPConnectionPool] = None,
+        chunk_size: int = SFTP_CHUNK_SIZE,
     ):
-        self.client = paramiko.SSHClient()
-        self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        # Connections are shared through the pool and returned on close()
+        self.pool = pool or sftp_pool
+        self.connection: Optional[PooledConnection] = None
         self.host = host
         self.port = port
         self.username = username
         self.password = password
         self.service_name = service_name
+        self.chunk_size = chunk_size
         self.channel = None
-        self.log_payload = {
-            "service_name": service_name,
+
+    def get_log_payload(
+        self, operation=None, remote_path=None, filename=None
+    ) -> dict:
+        return {
+            "service_name": self.service_name,
             "request_type": REQUEST_TYPES[1],
             "protocol": PROTOCOLS[1],
             "request_repr": {
-                "host": host,
-                "operation": None,
-                "remote_path": None,
-                "filename": None,
+                "host": self.host,
+                "operation": operation,
+                "remote_path": remote_path,
+                "filename": filename,
             },
             "response_repr": None,
             "error_message": None,
             "execution_time": 0,
         }
 
-    def __create_log(self):
-        # Add external service log
-        pass
+    def __create_log(self, log_payload: dict):
+        logger.api("Audit External Service", extra=log_payload)
 
     def connect(
         self,
     ) -> Tuple[Optional[paramiko.SFTPClient], Optional[Exception]]:
         try:
             if not self.channel:
-                self.client.connect(
-                    self.host,
-                    self.port,
-                    self.username,
-                    self.password,
-                    timeout=THIRTY_SECONDS_TIMEOUT,
+                self.connection = self.pool.acquire(
+                    self.host, self.port, self.username, self.password
                 )
-                self.channel = self.client.open_sftp()
-                logger.info("SFTP connection established successfully")
-            logger.info("Reusing existing SFTP connection")
+                self.channel = self.connection.channel
         except Exception as e:
             error_message = f"SFTP connection failed. Error: {str(e)}"
             logger.info(error_message)
-            self.log_payload["error_message"] = error_message
-            self.__create_log()
+            log_payload = self.get_log_payload()
+            log_payload["error_message"] = error_message
+            self.__create_log(log_payload)
             return None, e
 
         return self.channel, None
@@ -152,56 +371,154 @@ class SFTPClient:
     def is_valid_path(self, path_to_folder) -> Tuple[bool, Optional[str]]:
         if self.channel:
             try:
-                self.channel.listdir(path_to_folder)
-                logger.info(f"{path_to_folder} validated successfully")
-                return True, None
+                if self.pool.is_dir(self.connection, path_to_folder):
+                    return True, None
             except Exception as _:
-                return False, f"Folder({path_to_folder}) not found."
+                pass
+            return False, f"Folder({path_to_folder}) not found."
         return False, f"Connection not established"
 
-    def upload(
-        self, path_to_folder, filename, file_content
-    ) -> Tuple[bool, Optional[str]]:
+    def copy_chunks(self, source, target) -> int:
+        size = 0
+        while True:
+            chunk = source.read(self.chunk_size)
+            if not chunk:
+                return size
+            target.write(chunk)
+            size += len(chunk)
+
+    def upload(self, path_to_folder, filename, file_content) -> str:
+        """
+        Upload ``file_content`` (str, bytes or a binary file-like object) in
+        chunks of ``chunk_size``. Writes are pipelined, so chunks are sent
+        without waiting for the server to acknowledge each one.
+        """
+        if isinstance(file_content, str):
+            # paramiko's write() sent text as UTF-8
+            file_content = file_content.encode("utf-8")
+        if isinstance(file_content, (bytes, bytearray, memoryview)):
+            file_content = io.BytesIO(file_content)
+
+        def transfer():
+            with self.channel.open(
+                f"{path_to_folder}{filename}", "wb"
+            ) as remote_file:
+                remote_file.set_pipelined(True)
+                size = self.copy_chunks(file_content, remote_file)
+            return size, f"{filename} uploaded successfully to {path_to_folder}"
+
+        return self.transfer(OPERATIONS[0], path_to_folder, filename, transfer)
+
+    def download(self, path_to_folder, filename, destination) -> str:
+        """
+        Download a file into ``destination`` (a binary file-like object) in
+        chunks of ``chunk_size``. Reads are prefetched concurrently; at most
+        ``SFTP_MAX_CONCURRENT_REQUESTS`` are in flight.
+        """
+
+        def transfer():
+            with self.channel.open(
+                f"{path_to_folder}{filename}", "rb"
+            ) as remote_file:
+                remote_file.prefetch(
+                    max_concurrent_requests=SFTP_MAX_CONCURRENT_REQUESTS
+                )
+                size = self.copy_chunks(remote_file, destination)
+            return (
+                size,
+                f"{filename} downloaded successfully from {path_to_folder}",
+            )
+
+        return self.transfer(OPERATIONS[1], path_to_folder, filename, transfer)
+
+    def transfer(self, operation, path_to_folder, filename, transfer) -> str:
         start_time = time.time()
         result = ""
-
-        self.log_payload["request_repr"]["operation"] = OPERATIONS[0]
-        self.log_payload["request_repr"]["remote_path"] = path_to_folder
-        self.log_payload["request_repr"]["filename"] = filename
+        size = 0
+        log_payload = self.get_log_payload(operation, path_to_folder, filename)
 
         if self.channel:
             _, error = self.is_valid_path(path_to_folder)
 
-            if not error:
+            if error:
+                log_payload["error_message"] = (
+                    f"Path validation failed. Error: {str(error)}"
+                )
+            else:
                 try:
-                    with self.channel.open(
-                        f"{path_to_folder}{filename}", "wb"
-                    ) as remote_file:
-                        remote_file.write(file_content)
-                    result = (
-                        f"{filename} uploaded successfully to {path_to_folder}"
-                    )
+                    size, result = transfer()
                     logger.info(f"{result}")
                 except Exception as e:
-                    self.log_payload["error_message"] = (
-                        f"File upload failed. Error: {str(e)}"
+                    # The folder may be gone; validate it again next time
+                    self.pool.forget_path(self.connection.key, path_to_folder)
+                    log_payload["error_message"] = (
+                        f"File {operation} failed. Error: {str(e)}"
                     )
-            self.log_payload["error_message"] = (
-                f"Path validation failed. Error: {str(error)}"
-            )
         else:
-            self.log_payload["error_message"] = "Connection not established"
+            log_payload["error_message"] = "Connection not established"
 
         execution_time = time.time() - start_time
 
-        self.log_payload["response_repr"] = {"message": result}
-        self.log_payload["execution_time"] = execution_time
+        log_payload["response_repr"] = {
+            "message": result,
+            "bytes": size,
+            "mb_per_second": round(size / 1024 / 1024 / execution_time, 3)
+            if size and execution_time
+            else 0,
+        }
+        log_payload["execution_time"] = execution_time
 
-        self.__create_log()
+        self.__create_log(log_payload)
 
         return result
 
+    def upload_many(
+        self, path_to_folder, files: Dict[str, Any], max_workers: int = 4
+    ) -> Dict[str, str]:
+        """
+        Upload ``{filename: content}`` in parallel, one pooled connection per
+        worker. Returns ``{filename: result}``; failed files give "".
+        """
+        return self.transfer_many(
+            OPERATIONS[0], path_to_folder, files, max_workers
+        )
+
+    def download_many(
+        self, path_to_folder, files: Dict[str, Any], max_workers: int = 4
+    ) -> Dict[str, str]:
+        """Download ``{filename: destination}`` in parallel."""
+        return self.transfer_many(
+            OPERATIONS[1], path_to_folder, files, max_workers
+        )
+
+    def transfer_many(
+        self, operation, path_to_folder, files: Dict[str, Any], max_workers
+    ) -> Dict[str, str]:
+        def run(filename):
+            client = SFTPClient(
+                self.host,
+                self.port,
+                self.username,
+                self.password,
+                self.service_name,
+                pool=self.pool,
+                chunk_size=self.chunk_size,
+            )
+            _, error = client.connect()
+            if error:
+                return ""
+            try:
+                return getattr(client, operation)(
+                    path_to_folder, filename, files[filename]
+                )
+            finally:
+                client.close()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(files, executor.map(run, files)))
+
     def close(self):
-        if self.channel:
-            self.channel.close()
-        self.client.close()
+        if self.connection:
+            self.pool.release(self.connection)
+        self.connection = None
+        self.channel = None
@@ -0,0 +1,244 @@
+import glob
+import gzip
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Callable, Optional
+
+from .constants import COMPRESSION_METHODS
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# Uncompressed size of each gzip member / zstd frame. Every block ends on a
+# line boundary, so a reader can start decompressing at any block.
+COMPRESSION_BLOCK_SIZE = 1024 * 1024
+
+COMPRESSED_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+# Sentinel put on the task queue to stop the background worker
+_STOP = object()
+
+
+def get_compressor(method: str) -> Optional[Callable[[bytes], bytes]]:
+    if method not in COMPRESSION_METHODS:
+        raise ValueError(
+            f"compress must be one of {COMPRESSION_METHODS}, got {method!r}"
+        )
+    if method == "gzip":
+        return lambda block: gzip.compress(block, mtime=0)
+    if method == "zstd":
+        if zstandard is None:
+            raise ImportError("zstandard is not installed")
+        return zstandard.ZstdCompressor().compress
+    return None
+
+
+def segment_key(filename: str, path: str) -> int:
+    # "<filename>.<sequence>-20240101-120000[.gz]" -> sequence
+    sequence, dash, _ = path[len(filename) + 1 :].partition("-")
+    return int(sequence) if dash and sequence.isdigit() else 0
+
+
+def backup_number(filename: str, path: str) -> int:
+    # "<filename>.<n>" of RotatingFileHandler, 1 being the newest -> n
+    number = path[len(filename) + 1 :].partition(".")[0]
+    return int(number) if number.isdigit() else 0
+
+
+def list_segments(filename: str):
+    """
+    Rotated segments of ``filename``, oldest first: numbered backups of
+    RotatingFileHandler from the highest number down, then timestamped
+    segments in sequence order.
+    """
+    return sorted(
+        (
+            path
+            for path in glob.glob(f"{glob.escape(filename)}.[0-9]*")
+            if not path.endswith(".tmp")
+        ),
+        key=lambda path: (
+            segment_key(filename, path),
+            -backup_number(filename, path),
+        ),
+    )
+
+
+def iter_blocks(file, block_size: int = COMPRESSION_BLOCK_SIZE):
+    """Read ``file`` in blocks of about ``block_size`` ending on a newline."""
+    while True:
+        block = file.read(block_size)
+        if not block:
+            return
+        if not block.endswith(b"\n"):
+            block += file.readline()
+        yield block
+
+
+class SegmentRotator:
+    """
+    Rotates a log file into timestamped segments without blocking writers.
+
+    The file the handler switches to is opened ahead of time as
+    ``<filename>.next``, so a rollover is two renames: the current file
+    becomes ``<filename>.<sequence>-<YYYYmmdd-HHMMSS>`` and the pre-opened
+    one takes its name. The sequence continues from the newest existing
+    segment, so names are never reused and sort in rotation order. A
+    background thread then compresses the segment, removes segments beyond
+    ``backup_count`` (0 keeps all of them, never one still waiting for
+    compression) and opens the next file.
+
+    Compressed segments are written as a series of independent gzip members
+    (or zstd frames), one per block of lines; standard tools read them as a
+    single file.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        open_stream: Callable[[str], object],
+        compress: str = COMPRESSION_METHODS[1],
+        backup_count: int = 0,
+    ):
+        self.filename = filename
+        self.next_filename = f"{filename}.next"
+        self.open_stream = open_stream
+        self.compress = compress
+        self.compressor = get_compressor(compress)
+        self.suffix = COMPRESSED_SUFFIXES.get(compress, "")
+        self.backup_count = backup_count
+        self._next_stream = None
+        self._next_lock = threading.Lock()
+        self.tasks = queue.Queue()
+        # Rotated segments not compressed yet, which prune() must keep
+        self.pending = set()
+        self._pending_lock = threading.Lock()
+        segments = self.segments()
+        self.sequence = (
+            segment_key(filename, segments[-1]) + 1 if segments else 1
+        )
+        self._worker = threading.Thread(
+            target=self._work, name="easy-logging-rotation", daemon=True
+        )
+        self._worker.start()
+        # Segments left uncompressed by an earlier run
+        for segment in segments:
+            if not segment.endswith(tuple(COMPRESSED_SUFFIXES.values())):
+                self.enqueue(segment)
+        self.tasks.put(None)
+
+    def segments(self):
+        """Existing segments, oldest first."""
+        return list_segments(self.filename)
+
+    def segment_name(self) -> str:
+        name = (
+            f"{self.filename}.{self.sequence:08d}-"
+            f"{time.strftime('%Y%m%d-%H%M%S')}"
+        )
+        self.sequence += 1
+        return name
+
+    def enqueue(self, segment: str) -> None:
+        with self._pending_lock:
+            self.pending.add(segment)
+        self.tasks.put(segment)
+
+    def take_next_stream(self):
+        with self._next_lock:
+            stream, self._next_stream = self._next_stream, None
+        if stream is None:
+            # The worker has not caught up yet
+            stream = self.open_stream(self.next_filename)
+        return stream
+
+    def rotate(self, stream):
+        """Close ``stream``, move its file aside and return the next stream."""
+        if stream is not None:
+            stream.close()
+        next_stream = self.take_next_stream()
+
+        segment = None
+        if os.path.exists(self.filename):
+            segment = self.segment_name()
+            os.rename(self.filename, segment)
+        os.rename(self.next_filename, self.filename)
+
+        if segment is not None:
+            self.enqueue(segment)
+        else:
+            self.tasks.put(None)
+        return next_stream
+
+    def _work(self):
+        while True:
+            segment = self.tasks.get()
+            try:
+                if segment is _STOP:
+                    return
+                if segment is not None:
+                    try:
+                        self.compress_segment(segment)
+                    finally:
+                        with self._pending_lock:
+                            self.pending.discard(segment)
+                self.prune()
+                self.preopen()
+            except Exception as e:
+                logging.getLogger().error(f"Error in log rotation: {str(e)}")
+            finally:
+                self.tasks.task_done()
+
+    def preopen(self):
+        with self._next_lock:
+            if self._next_stream is None:
+                self._next_stream = self.open_stream(self.next_filename)
+
+    def compress_segment(self, segment: str) -> None:
+        if self.compressor is None:
+            return
+        target = segment + self.suffix
+        temporary = target + ".tmp"
+        with open(segment, "rb") as source, open(temporary, "wb") as output:
+            for block in iter_blocks(source):
+                output.write(self.compressor(block))
+        os.replace(temporary, target)
+        os.remove(segment)
+
+    def prune(self) -> None:
+        if self.backup_count <= 0:
+            return
+        segments = self.segments()
+        with self._pending_lock:
+            pending = set(self.pending)
+        for segment in segments[: max(0, len(segments) - self.backup_count)]:
+            if segment in pending:
+                continue
+            try:
+                os.remove(segment)
+            except OSError:
+                pass
+
+    def wait(self) -> None:
+        """Block until every rotated segment has been compressed."""
+        self.tasks.join()
+
+    def close(self) -> None:
+        if self._worker.is_alive():
+            self.tasks.put(_STOP)
+            self._worker.join()
+        with self._next_lock:
+            stream, self._next_stream = self._next_stream, None
+        if stream is not None:
+            stream.close()
+            # Nothing was written to it; the next run opens its own
+            try:
+                if os.path.getsize(self.next_filename) == 0:
+                    os.remove(self.next_filename)
+            except OSError:
+                pass
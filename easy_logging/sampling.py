@@ -0,0 +1,91 @@
+import random
+import re
+import zlib
+from functools import lru_cache
+from typing import Iterable, Optional
+
+
+def trace_fraction(trace_id: str) -> float:
+    """
+    Map a trace ID to [0, 1). Every service using CRC-32 on the same ID
+    makes the same sampling decision for the same rate.
+    """
+    return zlib.crc32(trace_id.encode("utf-8")) / 0x100000000
+
+
+class Sampler:
+    """
+    Decides which requests are logged.
+
+    ``sample`` runs before the request is handled and keeps a share of
+    requests given by the first matching rule (or ``rate``), based on the
+    trace ID so the decision is the same in every service. ``keep`` runs
+    afterwards and keeps sampled-out requests that failed (status code at
+    least ``keep_status``) or took longer than ``latency_threshold`` seconds.
+    """
+
+    def __init__(
+        self,
+        rate: float = 1.0,
+        rules: Iterable[dict] = (),
+        keep_status: Optional[int] = 400,
+        latency_threshold: Optional[float] = 1.0,
+        trace_id_header: Optional[str] = "X-Request-ID",
+        cache_size: int = 1024,
+    ):
+        self.rate = rate
+        self.rules = [
+            (
+                re.compile(rule["path"]).match if rule.get("path") else None,
+                frozenset(m.upper() for m in rule.get("methods", ())),
+                rule["rate"],
+            )
+            for rule in rules
+        ]
+        self.keep_status = keep_status
+        self.latency_threshold = latency_threshold
+        self.trace_id_header = trace_id_header
+        self.samples_all = rate >= 1 and all(r[2] >= 1 for r in self.rules)
+        self.get_rate = lru_cache(maxsize=cache_size)(self._get_rate)
+
+    def _get_rate(self, path: str, method: str) -> float:
+        for match, methods, rate in self.rules:
+            if match is not None and not match(path):
+                continue
+            if methods and method not in methods:
+                continue
+            return rate
+        return self.rate
+
+    def get_trace_id(self, request) -> Optional[str]:
+        if not self.trace_id_header:
+            return None
+        trace_id = request.headers.get(self.trace_id_header)
+        if trace_id is None:
+            # W3C trace context: version-traceid-parentid-flags
+            traceparent = request.headers.get("traceparent", "")
+            parts = traceparent.split("-")
+            if len(parts) == 4:
+                trace_id = parts[1]
+        return trace_id
+
+    def sample(self, request) -> bool:
+        if self.samples_all:
+            return True
+        rate = self.get_rate(request.path, request.method)
+        if rate >= 1:
+            return True
+        if rate <= 0:
+            return False
+        trace_id = self.get_trace_id(request)
+        if trace_id is None:
+            return random.random() < rate
+        return trace_fraction(trace_id) < rate
+
+    def keep(self, status_code: int, execution_time: float) -> bool:
+        if self.keep_status is not None and status_code >= self.keep_status:
+            return True
+        return (
+            self.latency_threshold is not None
+            and execution_time >= self.latency_threshold
+        )
@@ -11,3 +11,129 @@ UNREGISTERED_URLS.extend(
 
 # URL patterns to include in logging (if empty, all URLs are logged)
 REGISTERED_URLS = getattr(settings, "DJANGO_EASY_AUDIT_REGISTERED_URLS", [])
+
+# Django URL names (``namespace:name``) to exclude from / restrict logging to
+UNREGISTERED_URL_NAMES = getattr(
+    settings, "DJANGO_EASY_AUDIT_UNREGISTERED_URL_NAMES", []
+)
+REGISTERED_URL_NAMES = getattr(
+    settings, "DJANGO_EASY_AUDIT_REGISTERED_URL_NAMES", []
+)
+
+# HTTP methods to exclude from / restrict logging to
+UNREGISTERED_METHODS = getattr(
+    settings, "DJANGO_EASY_AUDIT_UNREGISTERED_METHODS", []
+)
+REGISTERED_METHODS = getattr(
+    settings, "DJANGO_EASY_AUDIT_REGISTERED_METHODS", []
+)
+
+# Number of per-path URL filter decisions kept in memory
+URL_FILTER_CACHE_SIZE = getattr(
+    settings, "DJANGO_EASY_AUDIT_URL_FILTER_CACHE_SIZE", 1024
+)
+
+# Request/response bodies larger than this are truncated in the log
+MAX_BODY_BYTES = getattr(
+    settings, "DJANGO_EASY_AUDIT_MAX_BODY_BYTES", 64 * 1024
+)
+
+# Content types whose bodies are logged, and ones that never are
+CAPTURE_CONTENT_TYPES = getattr(
+    settings,
+    "DJANGO_EASY_AUDIT_CAPTURE_CONTENT_TYPES",
+    ["application/json", "application/*+json", "text/*"],
+)
+SKIP_CONTENT_TYPES = getattr(
+    settings, "DJANGO_EASY_AUDIT_SKIP_CONTENT_TYPES", []
+)
+
+# Parse JSON bodies into objects (True) or log them as raw text (False)
+PARSE_BODIES = getattr(settings, "DJANGO_EASY_AUDIT_PARSE_BODIES", True)
+
+# Share of requests logged, between 0 and 1
+SAMPLE_RATE = getattr(settings, "DJANGO_EASY_AUDIT_SAMPLE_RATE", 1.0)
+
+# Per-endpoint rates; the first rule matching path and method wins, e.g.
+# [{"path": r"^/health/", "methods": ["GET"], "rate": 0.01}]
+SAMPLING_RULES = getattr(settings, "DJANGO_EASY_AUDIT_SAMPLING_RULES", [])
+
+# Responses with at least this status code are always logged
+SAMPLE_KEEP_STATUS = getattr(
+    settings, "DJANGO_EASY_AUDIT_SAMPLE_KEEP_STATUS", 400
+)
+
+# Requests slower than this many seconds are always logged (None disables)
+SAMPLE_LATENCY_THRESHOLD = getattr(
+    settings, "DJANGO_EASY_AUDIT_SAMPLE_LATENCY_THRESHOLD", 1.0
+)
+
+# Header carrying the request/trace ID that sampling decisions are based on
+TRACE_ID_HEADER = getattr(
+    settings, "DJANGO_EASY_AUDIT_TRACE_ID_HEADER", "X-Request-ID"
+)
+
+# Objects per audit record for bulk_create/bulk_update
+BULK_CHUNK_SIZE = getattr(settings, "DJANGO_EASY_AUDIT_BULK_CHUNK_SIZE", 1000)
+
+# Models ("app_label.ModelName") whose many-to-many state is never loaded
+M2M_SNAPSHOT_EXCLUDE = getattr(
+    settings, "DJANGO_EASY_AUDIT_M2M_SNAPSHOT_EXCLUDE", []
+)
+
+# Dotted path to a function turning the current user into the audit "user"
+USER_SERIALIZER = getattr(
+    settings,
+    "DJANGO_EASY_AUDIT_USER_SERIALIZER",
+    "easy_logging.signals.serialize_user",
+)
+
+# "full" logs the serialized user, "ref" only {"id": <pk>}
+ACTOR_FORMAT = getattr(settings, "DJANGO_EASY_AUDIT_ACTOR_FORMAT", "full")
+
+# Hold audit records raised inside transaction.atomic() until the commit,
+# drop them on rollback and merge repeated changes to the same object
+TRANSACTION_AWARE = getattr(
+    settings, "DJANGO_EASY_AUDIT_TRANSACTION_AWARE", True
+)
+
+# Models ("app_label.ModelName", or "__all__") whose UPDATE records carry
+# before/after values of the changed fields
+TRACK_CHANGES = getattr(settings, "DJANGO_EASY_AUDIT_TRACK_CHANGES", [])
+
+# Shared SFTP connections: maximum open, and seconds an idle one is kept
+SFTP_POOL_MAX_SIZE = getattr(
+    settings, "DJANGO_EASY_AUDIT_SFTP_POOL_MAX_SIZE", 8
+)
+SFTP_POOL_MAX_IDLE = getattr(
+    settings, "DJANGO_EASY_AUDIT_SFTP_POOL_MAX_IDLE", 300
+)
+
+# Seconds a validated remote folder is trusted without another stat
+SFTP_PATH_CACHE_TTL = getattr(
+    settings, "DJANGO_EASY_AUDIT_SFTP_PATH_CACHE_TTL", 60
+)
+
+# Size of the chunks SFTP transfers read and write, and the number of read
+# requests a download keeps in flight
+SFTP_CHUNK_SIZE = getattr(
+    settings, "DJANGO_EASY_AUDIT_SFTP_CHUNK_SIZE", 256 * 1024
+)
+SFTP_MAX_CONCURRENT_REQUESTS = getattr(
+    settings, "DJANGO_EASY_AUDIT_SFTP_MAX_CONCURRENT_REQUESTS", 64
+)
+
+# Audit log read by the history index (audit_history command); defaults to
+# the file handler of the "easy.crud" logger
+AUDIT_LOG_FILE = getattr(settings, "DJANGO_EASY_AUDIT_LOG_FILE", None)
+
+# Database alias the DatabaseLogHandler writes audit events to
+DB_ALIAS = getattr(settings, "DJANGO_EASY_AUDIT_DB_ALIAS", "default")
+
+# Seconds between summary records of the pipeline counters on the
+# "easy.stats" logger; 0 disables them
+STATS_INTERVAL = getattr(settings, "DJANGO_EASY_AUDIT_STATS_INTERVAL", 0)
+
+# With STATS_INTERVAL set, every process also keeps its latest counters in
+# a JSON file next to this one, read by the easy_logging_stats command
+STATS_FILE = getattr(settings, "DJANGO_EASY_AUDIT_STATS_FILE", None)
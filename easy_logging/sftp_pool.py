@@ -0,0 +1,246 @@
+import hashlib
+import stat
+import threading
+import time
+import logging
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+import paramiko
+
+logger = logging.getLogger(__name__)
+
+# (host, port, username, credential fingerprint)
+PoolKey = Tuple[str, int, str, str]
+
+
+def fingerprint(password) -> str:
+    """
+    SHA-256 of the credentials, so connections opened with different ones
+    are never shared and the pool does not keep them in plain text.
+    """
+    if password is None:
+        return ""
+    if isinstance(password, str):
+        password = password.encode("utf-8")
+    return hashlib.sha256(password).hexdigest()
+
+
+class PooledConnection:
+    """An SSH connection and its SFTP channel, used by one client at a time."""
+
+    __slots__ = ("key", "client", "channel", "last_used")
+
+    def __init__(self, key: PoolKey, client, channel):
+        self.key = key
+        self.client = client
+        self.channel = channel
+        self.last_used = time.monotonic()
+
+    def is_active(self) -> bool:
+        transport = self.client.get_transport()
+        return transport is not None and transport.is_active()
+
+    def close(self) -> None:
+        try:
+            self.channel.close()
+        finally:
+            self.client.close()
+
+
+def close_connection(connection: PooledConnection) -> None:
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+class SFTPConnectionPool:
+    """
+    Process-wide pool of SFTP connections keyed by (host, port, username)
+    and a fingerprint of the password.
+
+    A released connection is handed to the next client with the same key
+    instead of opening a new SSH session. Connections idle for longer than
+    ``max_idle`` seconds are closed whenever a connection is acquired or
+    released, and one idle for ``health_check_after``
+    seconds is probed with a ``stat`` before it is reused. At most
+    ``max_size`` connections are open; when the limit is reached the oldest
+    idle connection is closed, or ``acquire`` waits up to ``timeout``
+    seconds for one to be released.
+
+    Folders found by ``is_dir`` are cached per key for ``path_ttl`` seconds,
+    so repeated uploads to the same folder need no round trip at all.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 8,
+        max_idle: float = 300,
+        health_check_after: float = 30,
+        path_ttl: float = 60,
+        timeout: float = 30,
+    ):
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.health_check_after = health_check_after
+        self.path_ttl = path_ttl
+        self.timeout = timeout
+        self.idle: Dict[PoolKey, Deque[PooledConnection]] = {}
+        self.size = 0
+        self.valid_paths: Dict[PoolKey, Dict[str, float]] = {}
+        self.condition = threading.Condition()
+
+    def connect(self, key: PoolKey, password) -> PooledConnection:
+        host, port, username, _ = key
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        try:
+            client.connect(host, port, username, password, timeout=self.timeout)
+            channel = client.open_sftp()
+        except Exception:
+            client.close()
+            raise
+        return PooledConnection(key, client, channel)
+
+    def is_healthy(self, connection: PooledConnection, now: float) -> bool:
+        if not connection.is_active():
+            return False
+        if now - connection.last_used < self.health_check_after:
+            return True
+        try:
+            connection.channel.stat(".")
+        except Exception:
+            return False
+        return True
+
+    def acquire(self, host, port, username, password) -> PooledConnection:
+        key = (host, port, username, fingerprint(password))
+        deadline = time.monotonic() + self.timeout
+
+        # Only take connections out of the pool while holding the lock; the
+        # health check, closing and connecting run without it, so one slow
+        # host never blocks the clients of the others.
+        while True:
+            with self.condition:
+                expired = self.pop_expired()
+                connections = self.idle.get(key)
+                connection = connections.pop() if connections else None
+                replaced = None
+                reserved = False
+                if connection is None:
+                    if self.size < self.max_size:
+                        self.size += 1
+                        reserved = True
+                    else:
+                        # Take over the slot of the oldest idle connection
+                        replaced = self.pop_oldest_idle()
+                        reserved = replaced is not None
+                if connection is None and not reserved and not expired:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(
+                            "No SFTP connection available after "
+                            f"{self.timeout}s"
+                        )
+                    self.condition.wait(remaining)
+                    continue
+
+            for old in expired:
+                self.discard(old)
+            if replaced is not None:
+                close_connection(replaced)
+            if connection is not None:
+                if self.is_healthy(connection, time.monotonic()):
+                    logger.info("Reusing existing SFTP connection")
+                    return connection
+                self.discard(connection)
+                continue
+            if reserved:
+                break
+
+        # The slot is reserved
+        try:
+            connection = self.connect(key, password)
+        except Exception:
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+            raise
+        logger.info("SFTP connection established successfully")
+        return connection
+
+    def release(self, connection: PooledConnection) -> None:
+        with self.condition:
+            expired = self.pop_expired()
+            active = connection.is_active()
+            if active:
+                connection.last_used = time.monotonic()
+                self.idle.setdefault(connection.key, deque()).append(connection)
+                self.condition.notify()
+        for old in expired:
+            self.discard(old)
+        if not active:
+            self.discard(connection)
+
+    def discard(self, connection: PooledConnection) -> None:
+        """
+        Close a connection that is not returned to the pool and free its
+        slot. Must be called without holding the lock.
+        """
+        close_connection(connection)
+        with self.condition:
+            self.size -= 1
+            self.condition.notify()
+
+    def pop_expired(self) -> List[PooledConnection]:
+        """Take connections idle for longer than ``max_idle`` out of the pool."""
+        cutoff = time.monotonic() - self.max_idle
+        expired = []
+        for connections in self.idle.values():
+            # Oldest connections are at the left
+            while connections and connections[0].last_used < cutoff:
+                expired.append(connections.popleft())
+        return expired
+
+    def pop_oldest_idle(self) -> Optional[PooledConnection]:
+        oldest = None
+        for connections in self.idle.values():
+            if connections and (
+                oldest is None or connections[0].last_used < oldest.last_used
+            ):
+                oldest = connections[0]
+        if oldest is not None:
+            self.idle[oldest.key].popleft()
+        return oldest
+
+    def is_dir(self, connection: PooledConnection, path: str) -> bool:
+        """Whether ``path`` is a folder; one ``stat`` unless cached."""
+        now = time.monotonic()
+        paths = self.valid_paths.setdefault(connection.key, {})
+        expires = paths.get(path)
+        if expires is not None and expires > now:
+            return True
+
+        try:
+            attributes = connection.channel.stat(path)
+        except IOError:
+            paths.pop(path, None)
+            return False
+        if attributes.st_mode is None or not stat.S_ISDIR(attributes.st_mode):
+            return False
+        paths[path] = now + self.path_ttl
+        return True
+
+    def forget_path(self, key: PoolKey, path: str) -> None:
+        self.valid_paths.get(key, {}).pop(path, None)
+
+    def close(self) -> None:
+        with self.condition:
+            connections = [
+                connection for idle in self.idle.values() for connection in idle
+            ]
+            for idle in self.idle.values():
+                idle.clear()
+        for connection in connections:
+            self.discard(connection)
@@ -0,0 +1,133 @@
+import glob
+import gzip
+import heapq
+import json
+import os
+import re
+from itertools import chain
+from typing import Iterator, List, Optional
+
+from .rotation import list_segments
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# Lines written by EasyFormatter start with the timestamp
+TIMESTAMP_PREFIX = b'{"timestamp":"'
+
+
+def shard_filename(filename: str, pid: int) -> str:
+    """ "easy_logs/api.log" -> "easy_logs/api.<pid>.log"."""
+    root, ext = os.path.splitext(filename)
+    return f"{root}.{pid}{ext}"
+
+
+def shard_pid(filename: str, path: str) -> int:
+    """ "easy_logs/api.<pid>.log" of "easy_logs/api.log" -> pid."""
+    root, ext = os.path.splitext(filename)
+    return int(path[len(root) + 1 : len(path) - len(ext)])
+
+
+def pid_is_running(pid: int) -> bool:
+    if os.name == "nt":  # pragma: no cover - os.kill() terminates on Windows
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def list_shards(filename: str) -> List[str]:
+    """Shard files of ``filename`` written by any process, by name."""
+    root, ext = os.path.splitext(filename)
+    pattern = re.compile(re.escape(root) + r"\.\d+" + re.escape(ext) + "$")
+    return sorted(
+        path
+        for path in glob.glob(f"{glob.escape(root)}.[0-9]*{glob.escape(ext)}")
+        if pattern.match(path)
+    )
+
+
+def list_log_files(filename: str) -> List[List[str]]:
+    """
+    Every file holding records of ``filename``: one list per writer (the
+    file itself and each shard), with its rotated segments oldest first and
+    the live file last.
+    """
+    writers = []
+    for base in [filename, *list_shards(filename)]:
+        files = list_segments(base)
+        if os.path.exists(base):
+            files.append(base)
+        if files:
+            writers.append(files)
+    return writers
+
+
+def open_log_file(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise ImportError("zstandard is not installed")
+        return zstandard.ZstdDecompressor().stream_reader(
+            open(path, "rb"), closefd=True, read_across_frames=True
+        )
+    return open(path, "rb")
+
+
+def iter_file_lines(path: str) -> Iterator[bytes]:
+    # A last line without a newline is still being written and is skipped
+    with open_log_file(path) as file:
+        pending = b""
+        while True:
+            chunk = file.read(1024 * 1024)
+            if not chunk:
+                break
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                if line:
+                    yield line + b"\n"
+
+
+def get_timestamp(line: bytes) -> bytes:
+    if line.startswith(TIMESTAMP_PREFIX):
+        end = line.find(b'"', len(TIMESTAMP_PREFIX))
+        return line[len(TIMESTAMP_PREFIX) : end]
+    try:
+        return json.loads(line).get("timestamp", "").encode()
+    except (ValueError, AttributeError):
+        return b""
+
+
+def merge_lines(
+    filename: str, since: Optional[str] = None, until: Optional[str] = None
+) -> Iterator[bytes]:
+    """
+    Lines of ``filename`` and all of its shards and segments, merged by
+    timestamp. Each writer's files are already in order, so this is a
+    streaming k-way merge. ``until`` is exclusive.
+    """
+    since_key = since.encode() if since else None
+    until_key = until.encode() if until else None
+
+    def keyed(files):
+        for line in chain.from_iterable(map(iter_file_lines, files)):
+            timestamp = get_timestamp(line)
+            if since_key is not None and timestamp < since_key:
+                continue
+            if until_key is not None and timestamp >= until_key:
+                return
+            yield timestamp, line
+
+    for _, line in heapq.merge(
+        *(keyed(files) for files in list_log_files(filename)),
+        key=lambda item: item[0],
+    ):
+        yield line
@@ -1,82 +1,256 @@
 from django.db.models.signals import post_save, post_delete, m2m_changed
-from django.dispatch import receiver
 from django.apps import apps
-from django.db import models
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
 from django.contrib.auth import get_user_model
 from django.utils.module_loading import import_string
+import datetime
 import logging
-import inspect
-from functools import wraps
-from typing import Any, Optional, List, Dict
-from easy_logging.middleware import get_current_user
+import uuid
+import weakref
+from decimal import Decimal
+from functools import partial, wraps
+from typing import Any, List, Dict, Optional, Set, Tuple
+from easy_logging.buffer import get_buffer
+from easy_logging.handlers import log_batch
+from easy_logging.logger_level import AUDIT
+from easy_logging.middleware import get_current_actor
+from easy_logging.settings import (
+    ACTOR_FORMAT,
+    BULK_CHUNK_SIZE,
+    M2M_SNAPSHOT_EXCLUDE,
+    TRACK_CHANGES,
+    TRANSACTION_AWARE,
+    USER_SERIALIZER,
+)
 
 logger = logging.getLogger("easy.crud")
 user = get_user_model()
 
 EVENT_TYPES = ["CREATE", "UPDATE", "DELETE", "BULK_CREATE", "BULK_UPDATE"]
 
+# Models whose bulk operations are audited, looked up by the QuerySet patches
+AUDITED_MODELS: Set[type[models.Model]] = set()
+
+# M2M through model -> (model class, field name) of audited M2M fields
+M2M_FIELDS: Dict[type[models.Model], Tuple[type[models.Model], str]] = {}
+
+# Snapshot placeholder for a field that was deferred when loaded
+MISSING = object()
+
+# Values that cannot change in place, so comparing them with the snapshot is
+# reliable; anything else (JSONField dicts and lists) may have been mutated
+COMPARABLE_TYPES = (
+    str,
+    int,
+    float,
+    bytes,
+    type(None),
+    Decimal,
+    datetime.date,
+    datetime.time,
+    datetime.timedelta,
+    uuid.UUID,
+)
+
+original_bulk_create = models.QuerySet.bulk_create
+original_bulk_update = models.QuerySet.bulk_update
+
+
+# User attributes logged by serialize_user, when the user model has them
+USER_FIELDS = [
+    "title",
+    "email",
+    "first_name",
+    "middle_name",
+    "last_name",
+    "sex",
+    "date_of_birth",
+]
+
+_user_serializer = None
+
+
+def serialize_user(user) -> dict:
+    """Default DJANGO_EASY_AUDIT_USER_SERIALIZER."""
+    if not user.is_authenticated:
+        return {}
+    data = {"id": str(user.pk)}
+    for field in USER_FIELDS:
+        if hasattr(user, field):
+            data[field] = getattr(user, field)
+    return data
+
+
+def get_user_serializer():
+    global _user_serializer
+    if _user_serializer is None:
+        _user_serializer = import_string(USER_SERIALIZER)
+    return _user_serializer
+
 
 def get_user_details():
-    user = get_current_user()
-    data = {}
-    if user:
-        data = {
-            "id": str(user.id),
-            "title": user.title,
-            "email": user.email,
-            "first_name": user.first_name,
-            "middle_name": user.middle_name,
-            "last_name": user.last_name,
-            "sex": user.sex,
-            "date_of_birth": user.date_of_birth,
-        }
+    return get_current_actor(get_user_serializer())
+
+
+def get_actor() -> dict:
+    """The audit record "user": the full user details or only their id."""
+    data = get_user_details()
+    if ACTOR_FORMAT == "ref" and data:
+        return {"id": data.get("id")}
     return data
 
 
-def get_calling_model() -> Optional[str]:
-    """Get the model name from the calling function's frame."""
-    try:
-        # Get the current frame
-        frame = inspect.currentframe()
-        # Go up 3 frames to get to the actual calling function
-        # (1 for get_calling_model, 1 for the signal handler, 1 for the bulk operation)
-        for _ in range(3):
-            frame = frame.f_back
-            if frame is None:
-                return None
-
-        # Get the calling function's name
-        calling_function = frame.f_code.co_name
-        # Get the module name
-        module_name = frame.f_globals.get("__name__", "")
-
-        # Check if this is a direct bulk operation call
-        if (
-            "bulk_create" in calling_function
-            or "bulk_update" in calling_function
-        ):
-            return module_name.split(".")[-1]
-    except Exception:
-        pass
-    return None
+class SnapshotUndo:
+    """
+    Snapshot values replaced by one save inside transaction.atomic(). Django
+    holds the only reference to its commit hook and drops the hook when the
+    savepoint or transaction of the save rolls back, so a dead hook that has
+    not run means the save was undone.
+    """
+
+    def __init__(self, replaced: dict, using: str):
+        self.replaced = replaced
+        self.committed = False
+        hook = partial(setattr, self, "committed", True)
+        self.hook = weakref.ref(hook)
+        transaction.on_commit(hook, using, robust=True)
+
+    def is_pending(self) -> bool:
+        return self.hook() is not None
 
 
 class ModelSignalMixin:
     """Mixin to add signal handling capabilities to models."""
 
-    def __init__(self, *args: Any, **kwargs: Any) -> None:
-        super().__init__(*args, **kwargs)
-        self._original_m2m = self._get_m2m_state()
-
-    def _get_m2m_state(self) -> dict:
-        """Get the current state of M2M fields."""
+    # Set to False on a model to never load its M2M state
+    easy_audit_m2m_snapshot = True
+
+    # Set to True on a model to log before/after values of changed fields
+    easy_audit_track_changes = False
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if cls.easy_audit_track_changes:
+            instance._easy_audit_snapshot = instance._get_field_state()
+        return instance
+
+    def _get_field_state(self) -> dict:
+        """
+        Values of the concrete fields loaded on this instance. Deferred fields
+        are not in __dict__ and are left out instead of being fetched; values
+        are not copied.
+        """
+        values = self.__dict__
         return {
-            field.name: set(
-                getattr(self, field.name).all().values_list("id", flat=True)
-            )
-            for field in self._meta.many_to_many
+            attname: values[attname]
+            for attname in self._easy_audit_attnames
+            if attname in values
         }
 
+    def _get_attnames(self, update_fields) -> Set[str]:
+        return {self._meta.get_field(name).attname for name in update_fields}
+
+    def _get_field_changes(self, update_fields=None) -> Tuple[dict, bool]:
+        """
+        Changed fields since the instance was loaded or last saved, and
+        whether that is all of them: the snapshot holds the same objects, so
+        a mutable value changed in place cannot be detected.
+        """
+        snapshot = self.__dict__.get("_easy_audit_snapshot")
+        if snapshot is None:
+            return {}, False
+        self._restore_snapshot()
+
+        current = self._get_field_state()
+        if update_fields is not None:
+            names = self._get_attnames(update_fields)
+            current = {k: v for k, v in current.items() if k in names}
+
+        changes = {}
+        complete = True
+        for attname, value in current.items():
+            before = snapshot.get(attname, MISSING)
+            if before is MISSING:
+                # Deferred when loaded: the previous value is unknown
+                changes[attname] = {"after": value}
+            elif before != value:
+                changes[attname] = {"before": before, "after": value}
+            elif not isinstance(value, COMPARABLE_TYPES):
+                complete = False
+        return changes, complete
+
+    def _update_snapshot(self, update_fields=None) -> None:
+        """
+        Take the saved fields as the new snapshot right away, so later saves
+        in the same transaction are compared with them. Inside
+        transaction.atomic() the replaced values are kept until the commit,
+        for ``_restore_snapshot`` to put back if the save is rolled back.
+        """
+        state = self._get_field_state()
+        if update_fields is not None:
+            names = self._get_attnames(update_fields)
+            state = {k: v for k, v in state.items() if k in names}
+
+        snapshot = self.__dict__.get("_easy_audit_snapshot")
+        if snapshot is None:
+            snapshot = self._easy_audit_snapshot = {}
+        if connections[self._state.db].in_atomic_block:
+            replaced = {k: snapshot.get(k, MISSING) for k in state}
+            self.__dict__.setdefault("_easy_audit_undo", []).append(
+                SnapshotUndo(replaced, self._state.db)
+            )
+        snapshot.update(state)
+
+    def _restore_snapshot(self) -> None:
+        """Put back the values of saves whose transaction was rolled back."""
+        pending = self.__dict__.get("_easy_audit_undo")
+        if not pending:
+            return
+        snapshot = self._easy_audit_snapshot
+        kept = []
+        # Newest first, so each field ends up with its oldest replaced value
+        for undo in reversed(pending):
+            if undo.committed:
+                continue
+            if not undo.is_pending():
+                for attname, value in undo.replaced.items():
+                    if value is MISSING:
+                        snapshot.pop(attname, None)
+                    else:
+                        snapshot[attname] = value
+            else:
+                kept.append(undo)
+        kept.reverse()
+        self._easy_audit_undo = kept
+
+    def _get_m2m_ids(self, field_name: str) -> Optional[set]:
+        """
+        Current ids of one M2M field, read just before clear() runs; from the
+        prefetch_related() results when there are any.
+        """
+        if self.pk is None or not self.easy_audit_m2m_snapshot:
+            return None
+        prefetched = getattr(self, "_prefetched_objects_cache", {})
+        if field_name in prefetched:
+            return {obj.pk for obj in prefetched[field_name]}
+        return set(getattr(self, field_name).values_list("pk", flat=True))
+
+
+def split_event(event: dict) -> Tuple[str, dict]:
+    payload = dict(event)
+    return payload.pop("message"), payload
+
+
+def write_log(event: dict) -> None:
+    message, payload = split_event(event)
+    logger.audit(message, extra=payload)
+
+
+def write_logs(events: List[dict]) -> None:
+    """Write the committed events of a transaction as one batch."""
+    log_batch(logger, AUDIT, [split_event(event) for event in events])
+
 
 def push_log(
     message: str,
@@ -84,15 +258,31 @@ def push_log(
     event_type: str,
     instance_id: str,
     extra: dict = {},
+    using: Optional[str] = None,
+    label: Optional[str] = None,
 ) -> None:
-    payload: dict = {
+    """
+    Log an audit event. Inside transaction.atomic() on ``using``, the event
+    is held until the commit and dropped on rollback; events on the same
+    object (``label``, the model's app_label.ModelName, and
+    ``instance_id``) are merged into one.
+    """
+    event: dict = {
+        "message": message,
         "model": model,
         "instance_id": str(instance_id),
         "event_type": event_type,
-        "user": get_user_details(),
-        "extra": extra,
+        "user": get_actor(),
+        "extra": dict(extra),
     }
-    logger.audit(message, extra=payload)
+
+    if TRANSACTION_AWARE:
+        connection = connections[using or DEFAULT_DB_ALIAS]
+        if connection.in_atomic_block:
+            get_buffer(connection, write_logs).defer(event, label or model)
+            return
+
+    write_log(event)
 
 
 def get_changed_fields(
@@ -102,25 +292,199 @@ def get_changed_fields(
     return {field: getattr(instance, field) for field in fields}
 
 
+def get_field_columns(
+    objs: List[models.Model], model_class: type[models.Model], fields: List[str]
+) -> Dict[str, List[Any]]:
+    """
+    Get the field values of several instances column by column. Relations are
+    read through their attname, so no related object is fetched.
+    """
+    columns = {}
+    for field in fields:
+        attname = model_class._meta.get_field(field).attname
+        columns[field] = [getattr(obj, attname) for obj in objs]
+    return columns
+
+
+def push_bulk_log(
+    model_class: type[models.Model],
+    event_type: str,
+    objs: List[models.Model],
+    fields: List[str],
+    using: Optional[str] = None,
+) -> None:
+    """
+    Log a bulk operation as one record per chunk of BULK_CHUNK_SIZE objects.
+    Each record carries the pks of its objects and their field values in
+    columns, in the same order as ``instance_ids``.
+    """
+    model = model_class.__name__
+    total = len(objs)
+    chunks = (total + BULK_CHUNK_SIZE - 1) // BULK_CHUNK_SIZE
+    for index, start in enumerate(range(0, total, BULK_CHUNK_SIZE), 1):
+        chunk = objs[start : start + BULK_CHUNK_SIZE]
+        push_log(
+            f"{event_type} event for {model} ({len(chunk)} objects, chunk {index}/{chunks})",
+            model,
+            event_type,
+            chunk[0].pk,
+            {
+                "total_count": total,
+                "chunk": index,
+                "chunks": chunks,
+                "instance_ids": [obj.pk for obj in chunk],
+                "fields": fields,
+                "changes": get_field_columns(chunk, model_class, fields),
+            },
+            using,
+            model_class._meta.label,
+        )
+
+
+@wraps(original_bulk_create)
+def bulk_create_with_signals(
+    self: models.QuerySet, objs: List[models.Model], *args: Any, **kwargs: Any
+) -> List[models.Model]:
+    created_objs = original_bulk_create(self, objs, *args, **kwargs)
+
+    if created_objs and self.model in AUDITED_MODELS:
+        push_bulk_log(
+            self.model,
+            EVENT_TYPES[3],
+            created_objs,
+            [
+                field.name
+                for field in self.model._meta.concrete_fields
+                if not field.primary_key
+            ],
+            self.db,
+        )
+
+    return created_objs
+
+
+@wraps(original_bulk_update)
+def bulk_update_with_signals(
+    self: models.QuerySet,
+    objs: List[models.Model],
+    fields: List[str],
+    *args: Any,
+    **kwargs: Any,
+) -> int:
+    if self.model not in AUDITED_MODELS:
+        return original_bulk_update(self, objs, fields, *args, **kwargs)
+
+    objs = list(objs)
+    rows = original_bulk_update(self, objs, fields, *args, **kwargs)
+    if objs:
+        push_bulk_log(self.model, EVENT_TYPES[4], objs, fields, self.db)
+
+    return rows
+
+
+def patch_queryset() -> None:
+    """
+    Install the bulk operation wrappers on QuerySet once, whatever the number
+    of audited models.
+    """
+    models.QuerySet.bulk_create = bulk_create_with_signals
+    models.QuerySet.bulk_update = bulk_update_with_signals
+
+
+def handle_m2m_changed(
+    sender: type[models.Model],
+    instance: models.Model,
+    action: str,
+    pk_set: set,
+    reverse: bool,
+    **kwargs: Any,
+) -> None:
+    model_class, attr = M2M_FIELDS[sender]
+    field_name = kwargs.get("model", sender).__name__.lower()
+    related_ids = list(pk_set) if pk_set else None
+    if reverse:
+        # The instance is on the related side of the field
+        model_class = type(instance)
+    elif action == "pre_clear":
+        # clear() sends no pk_set: read this field's ids before they are gone
+        cleared = instance.__dict__.setdefault("_easy_audit_cleared", {})
+        cleared[attr] = instance._get_m2m_ids(attr)
+        return
+    elif action == "post_clear":
+        cleared = instance.__dict__.get("_easy_audit_cleared", {}).pop(
+            attr, None
+        )
+        related_ids = list(cleared) if cleared else None
+
+    if action not in ["post_add", "post_remove", "post_clear"]:
+        return
+
+    push_log(
+        f"M2M {action} event for {model_class.__name__} (id: {instance.pk})",
+        model_class.__name__,
+        f"M2M_{action.upper()}",
+        instance.pk,
+        {
+            "field_name": field_name,
+            "related_ids": related_ids,
+        },
+        kwargs.get("using"),
+        model_class._meta.label,
+    )
+
+
+def handle_delete(
+    sender: type[models.Model], instance: models.Model, **kwargs: Any
+) -> None:
+    push_log(
+        f"{EVENT_TYPES[2]} event for {sender.__name__} (id: {instance.pk})",
+        sender.__name__,
+        EVENT_TYPES[2],
+        instance.pk,
+        {},
+        kwargs.get("using"),
+        sender._meta.label,
+    )
+
+
 def patch_model_event(model_class: type[models.Model]) -> None:
     """Monkey patch a model to add signal handling capabilities."""
     if not issubclass(model_class, ModelSignalMixin):
         # Add the mixin to the model's base classes
         model_class.__bases__ = (ModelSignalMixin,) + model_class.__bases__
+        AUDITED_MODELS.add(model_class)
+        model_class._easy_audit_attnames = tuple(
+            field.attname for field in model_class._meta.concrete_fields
+        )
+        if (
+            TRACK_CHANGES == "__all__"
+            or model_class._meta.label in TRACK_CHANGES
+        ):
+            model_class.easy_audit_track_changes = True
 
         # Store the original methods
         original_save = model_class.save
-        original_bulk_create = models.QuerySet.bulk_create
-        original_bulk_update = models.QuerySet.bulk_update
 
         @wraps(original_save)
         def save_with_signals(
             self: models.Model, *args: Any, **kwargs: Any
         ) -> None:
             is_new = self._state.adding
+            extra = {}
+            tracked = self.easy_audit_track_changes
+            update_fields = kwargs.get("update_fields")
+            if tracked and not is_new:
+                changes, complete = self._get_field_changes(update_fields)
+                if changes:
+                    extra = {"changes": changes}
+                elif complete:
+                    # Nothing changed since it was loaded: save without a log
+                    return original_save(self, *args, **kwargs)
 
             # Call the original save method
             original_save(self, *args, **kwargs)
+            if tracked:
+                self._update_snapshot(update_fields)
 
             # Log the event
             event_type = EVENT_TYPES[0] if is_new else EVENT_TYPES[1]
@@ -130,126 +494,43 @@ def patch_model_event(model_class: type[models.Model]) -> None:
                 model_class.__name__,
                 event_type,
                 self.pk,
-                {},
+                extra,
+                self._state.db,
+                model_class._meta.label,
             )
 
-        @wraps(original_bulk_create)
-        def bulk_create_with_signals(
-            self, objs: List[models.Model], *args: Any, **kwargs: Any
-        ) -> List[models.Model]:
-            if not objs:
-                return original_bulk_create(self, objs, *args, **kwargs)
-
-            # Get the calling model
-            calling_model = get_calling_model()
-            if not calling_model:
-                return original_bulk_create(self, objs, *args, **kwargs)
-
-            # Call the original bulk_create method
-            created_objs = original_bulk_create(self, objs, *args, **kwargs)
-
-            # Log only if this is the calling model
-            if calling_model == model_class.__name__:
-                first_obj = created_objs[0]
-                push_log(
-                    f"{EVENT_TYPES[3]} event for {model_class.__name__} (id: {first_obj.pk})",
-                    model_class.__name__,
-                    EVENT_TYPES[3],
-                    first_obj.pk,
-                    {
-                        "total_count": len(created_objs),
-                    },
-                )
-
-            return created_objs
-
-        @wraps(original_bulk_update)
-        def bulk_update_with_signals(
-            self,
-            objs: List[models.Model],
-            fields: List[str],
-            *args: Any,
-            **kwargs: Any,
-        ) -> None:
-            if not objs:
-                return original_bulk_update(self, objs, fields, *args, **kwargs)
-
-            # Get the calling model
-            calling_model = get_calling_model()
-            if not calling_model:
-                return original_bulk_update(self, objs, fields, *args, **kwargs)
-
-            # Get the changes for the first object
-            first_obj = objs[0]
-            changes = get_changed_fields(first_obj, fields)
-
-            # Call the original bulk_update method
-            original_bulk_update(self, objs, fields, *args, **kwargs)
-
-            # Log only if this is the calling model
-            if calling_model == model_class.__name__:
-                push_log(
-                    f"{EVENT_TYPES[4]} event for {model_class.__name__}",
-                    model_class.__name__,
-                    EVENT_TYPES[4],
-                    first_obj.pk,
-                    {
-                        "total_count": len(objs),
-                        "fields": fields,
-                        "changes": changes,
-                    },
-                )
-
         # Replace the methods
         model_class.save = save_with_signals
-        models.QuerySet.bulk_create = bulk_create_with_signals
-        models.QuerySet.bulk_update = bulk_update_with_signals
 
         # Add delete signal handling
-        @receiver(post_delete, sender=model_class)
-        def handle_delete(
-            sender: type[models.Model], instance: models.Model, **kwargs: Any
-        ) -> None:
-            push_log(
-                f"{EVENT_TYPES[2]} event for {model_class.__name__} (id: {instance.pk})",
-                model_class.__name__,
-                EVENT_TYPES[2],
-                instance.pk,
-            )
+        post_delete.connect(
+            handle_delete,
+            sender=model_class,
+            weak=False,
+            dispatch_uid=f"easy_logging_delete_{model_class._meta.label}",
+        )
 
         # Add M2M signal handling
+        if model_class._meta.label in M2M_SNAPSHOT_EXCLUDE:
+            model_class.easy_audit_m2m_snapshot = False
         for field in model_class._meta.many_to_many:
-
-            @receiver(
-                m2m_changed, sender=getattr(model_class, field.name).through
+            through = getattr(model_class, field.name).through
+            M2M_FIELDS[through] = (model_class, field.name)
+            m2m_changed.connect(
+                handle_m2m_changed,
+                sender=through,
+                weak=False,
+                dispatch_uid=f"easy_logging_m2m_{through._meta.label}",
             )
-            def handle_m2m_changed(
-                sender: type[models.Model],
-                instance: models.Model,
-                action: str,
-                pk_set: set,
-                **kwargs: Any,
-            ) -> None:
-                if action not in ["post_add", "post_remove", "post_clear"]:
-                    return
-
-                field_name = kwargs.get("model", sender).__name__.lower()
-                push_log(
-                    f"M2M {action} event for {model_class.__name__} (id: {instance.pk})",
-                    model_class.__name__,
-                    f"M2M_{action.upper()}",
-                    instance.pk,
-                    {
-                        "field_name": field_name,
-                        "related_ids": list(pk_set) if pk_set else None,
-                    },
-                )
 
 
 def setup_model_signals() -> None:
     """Set up signals for all models in the project."""
+    patch_queryset()
     for app_config in apps.get_app_configs():
         for model in app_config.get_models():
+            if getattr(model, "easy_audit_ignore", False):
+                continue
             if not issubclass(model, ModelSignalMixin):
                 patch_model_event(model)
 
@@ -0,0 +1,384 @@
+import glob
+import http.client
+import logging
+import os
+import shutil
+import socket
+import threading
+import time
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .constants import NETWORK_TRANSPORTS, OVERFLOW_POLICIES
+from .handlers import QueueWriterMixin
+from .shards import pid_is_running
+from .stats import register
+
+
+# Errors of a kept-alive connection the other side has closed
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+
+class HTTPTransport:
+    """POSTs batches as newline-delimited JSON over one keep-alive connection."""
+
+    def __init__(self, address: str, timeout: float):
+        url = urlsplit(address)
+        self.connection_class = (
+            http.client.HTTPSConnection
+            if url.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        self.netloc = url.netloc
+        self.path = url.path or "/"
+        if url.query:
+            self.path += f"?{url.query}"
+        self.timeout = timeout
+        self.connection = None
+
+    def send(self, payload: bytes) -> None:
+        reused = self.connection is not None
+        try:
+            response = self.post(payload)
+        except STALE_CONNECTION_ERRORS:
+            if not reused:
+                raise
+            # The collector closed the connection while it was idle
+            response = self.post(payload)
+        if not 200 <= response.status < 300:
+            raise ConnectionError(f"Collector returned {response.status}")
+
+    def post(self, payload: bytes):
+        if self.connection is None:
+            self.connection = self.connection_class(
+                self.netloc, timeout=self.timeout
+            )
+        try:
+            self.connection.request(
+                "POST",
+                self.path,
+                body=payload,
+                headers={"Content-Type": "application/x-ndjson"},
+            )
+            response = self.connection.getresponse()
+            # Read the body so the connection can be reused
+            response.read()
+        except Exception:
+            self.close()
+            raise
+        return response
+
+    def close(self) -> None:
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+class TCPTransport:
+    """
+    Writes batches as newline-delimited JSON to one persistent socket.
+
+    Delivery is at most once: a batch counts as sent once ``sendall()``
+    returns, which only means the kernel buffered it. Batches still in
+    flight when the connection breaks are lost rather than spooled; use the
+    HTTP transport when every record must be acknowledged.
+    """
+
+    def __init__(self, address: str, timeout: float):
+        host, _, port = address.rpartition(":")
+        self.address = (host, int(port))
+        self.timeout = timeout
+        self.socket = None
+
+    def send(self, payload: bytes) -> None:
+        try:
+            if self.socket is None:
+                self.socket = socket.create_connection(
+                    self.address, timeout=self.timeout
+                )
+            self.socket.sendall(payload)
+        except Exception:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+
+
+TRANSPORTS = dict(zip(NETWORK_TRANSPORTS, (HTTPTransport, TCPTransport)))
+
+
+class DiskSpool:
+    """
+    Bounded on-disk FIFO of batches that could not be sent.
+
+    Every batch is one file named ``<sequence>-<records>.ndjson``, so the
+    spool survives restarts and is replayed in order. When it grows beyond
+    ``max_bytes`` the oldest batches are deleted and counted as dropped.
+
+    Each process spools to its own ``<directory>/<pid>`` folder, and takes
+    over the folders of processes that are no longer running.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.root = directory
+        self.directory = os.path.join(directory, str(os.getpid()))
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+        self.batches: List[Tuple[str, int, int]] = self.read_batches(
+            self.directory
+        )
+        self.next_sequence = (
+            self.sequence(self.batches[-1][0]) + 1 if self.batches else 0
+        )
+        self.bytes = sum(size for _, _, size in self.batches)
+        self.records = sum(records for _, records, _ in self.batches)
+        self.dropped = 0
+        self.adopt_orphans()
+
+    @classmethod
+    def read_batches(cls, directory: str) -> List[Tuple[str, int, int]]:
+        batches = []
+        for path in glob.glob(os.path.join(glob.escape(directory), "*.ndjson")):
+            sequence, _, records = os.path.basename(path)[
+                : -len(".ndjson")
+            ].partition("-")
+            if sequence.isdigit() and records.isdigit():
+                batches.append((path, int(records), os.path.getsize(path)))
+        batches.sort(key=lambda batch: cls.sequence(batch[0]))
+        return batches
+
+    def adopt_orphans(self) -> None:
+        """Move the batches of exited processes into this spool."""
+        pid = os.getpid()
+        for path in sorted(
+            glob.glob(os.path.join(glob.escape(self.root), "*"))
+        ):
+            # "<pid>", or "<pid>.<adopting pid>" if that process died too
+            name = os.path.basename(path)
+            parts = name.split(".")
+            if not all(part.isdigit() for part in parts) or len(parts) > 2:
+                continue
+            owner = int(parts[-1])
+            if owner == pid or pid_is_running(owner):
+                continue
+            claimed = os.path.join(self.root, f"{parts[0]}.{pid}")
+            try:
+                # Only one process wins the rename
+                os.rename(path, claimed)
+            except OSError:
+                continue
+            for batch, records, _ in self.read_batches(claimed):
+                with open(batch, "rb") as file:
+                    self.push(file.read(), records)
+                os.remove(batch)
+            shutil.rmtree(claimed, ignore_errors=True)
+
+    @staticmethod
+    def sequence(path: str) -> int:
+        return int(os.path.basename(path).partition("-")[0])
+
+    def __len__(self) -> int:
+        return len(self.batches)
+
+    def push(self, payload: bytes, records: int) -> None:
+        path = os.path.join(
+            self.directory, f"{self.next_sequence:012d}-{records}.ndjson"
+        )
+        self.next_sequence += 1
+        with open(path, "wb") as file:
+            file.write(payload)
+        self.batches.append((path, records, len(payload)))
+        self.bytes += len(payload)
+        self.records += records
+        while self.bytes > self.max_bytes and len(self.batches) > 1:
+            _, records, _ = self.batches[0]
+            self.pop()
+            self.dropped += records
+
+    def peek(self) -> Tuple[bytes, int]:
+        path, records, _ = self.batches[0]
+        with open(path, "rb") as file:
+            return file.read(), records
+
+    def pop(self) -> None:
+        path, records, size = self.batches.pop(0)
+        self.bytes -= size
+        self.records -= records
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def oldest_age(self) -> float:
+        if not self.batches:
+            return 0
+        try:
+            return time.time() - os.path.getmtime(self.batches[0][0])
+        except OSError:
+            return 0
+
+
+class NetworkLogHandler(QueueWriterMixin, logging.Handler):
+    """
+    Ships records to a collector in batches, over HTTP (``address`` is a
+    URL) or TCP (``address`` is "host:port"), as newline-delimited JSON on a
+    kept-alive connection.
+
+    Records are queued and batched like ``QueuedEasyLogHandler``. A batch
+    that cannot be sent goes to a ``DiskSpool`` in ``spool_dir`` (one
+    folder per process); while the
+    spool is not empty new batches are appended to it as well, so records
+    always arrive in order. Every ``retry_interval`` seconds the spool is
+    replayed, oldest batch first. ``stats()`` reports the backpressure:
+    queue depth, blocked and dropped records, spool size and age, and send
+    failures.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        transport: str = NETWORK_TRANSPORTS[0],
+        timeout: float = 5.0,
+        spool_dir: str = "easy_logs/spool",
+        spool_max_bytes: int = 100 * 1024 * 1024,
+        retry_interval: float = 5.0,
+        queue_size: int = 10000,
+        overflow: str = OVERFLOW_POLICIES[0],
+        batch_size: int = 500,
+        batch_interval: int = 100,
+    ):
+        if transport not in NETWORK_TRANSPORTS:
+            raise ValueError(
+                f"transport must be one of {NETWORK_TRANSPORTS}, "
+                f"got {transport!r}"
+            )
+        super().__init__()
+        self.transport = TRANSPORTS[transport](address, timeout)
+        self.spool = DiskSpool(spool_dir, spool_max_bytes)
+        self.retry_interval = retry_interval
+        self.retry_at = 0.0
+        self.sent_batches = 0
+        self.sent_records = 0
+        self.failed_sends = 0
+        self.last_error: Optional[str] = None
+        self._send_lock = threading.Lock()
+        register(self)
+        self.start_writer(queue_size, overflow, batch_size, batch_interval)
+
+    def restart_writer(self):
+        # The connection and the spool belong to the parent process
+        self._send_lock = threading.Lock()
+        self.transport.close()
+        self.spool = DiskSpool(self.spool.root, self.spool.max_bytes)
+        super().restart_writer()
+
+    def format_payload(self, records) -> Tuple[bytes, list]:
+        """
+        Newline-delimited lines of the records, and the records they hold:
+        the ones that fail to format are left out.
+        """
+        format_bytes = getattr(self.formatter, "format_bytes", None)
+        lines = []
+        formatted = []
+        for record in records:
+            try:
+                # Same record preparation as the file handlers
+                if hasattr(record, "extra"):
+                    for key, value in record.extra.items():
+                        setattr(record, key, value)
+                if format_bytes is not None:
+                    lines.append(format_bytes(record))
+                else:
+                    lines.append(self.format(record).encode("utf-8"))
+                formatted.append(record)
+            except Exception as e:
+                self.metrics.add_error(e)
+                self.handleError(record)
+        return b"".join(line + b"\n" for line in lines), formatted
+
+    def try_send(self, payload: bytes, records: int) -> bool:
+        try:
+            self.transport.send(payload)
+        except Exception as e:
+            self.failed_sends += 1
+            self.last_error = str(e)
+            self.metrics.add_error(e)
+            self.retry_at = time.monotonic() + self.retry_interval
+            return False
+        self.sent_batches += 1
+        self.sent_records += records
+        self.last_error = None
+        return True
+
+    def replay(self) -> bool:
+        """Send spooled batches in order; True once the spool is empty."""
+        if self.spool and time.monotonic() < self.retry_at:
+            return False
+        while self.spool:
+            payload, records = self.spool.peek()
+            if not self.try_send(payload, records):
+                return False
+            self.spool.pop()
+        return True
+
+    def write_records(self, records):
+        started = time.perf_counter()
+        payload, records = self.format_payload(records)
+        if not payload:
+            return
+        formatted = time.perf_counter()
+        with self._send_lock:
+            try:
+                if not (self.replay() and self.try_send(payload, len(records))):
+                    self.spool.push(payload, len(records))
+            except Exception as e:
+                self.metrics.add_error(e)
+                logging.getLogger().error(
+                    f"Error in NetworkLogHandler: {str(e)}"
+                )
+        # Spooled batches count as written: they reach the collector later
+        self.metrics.add_batch(
+            records,
+            formatted - started,
+            time.perf_counter() - formatted,
+            len(payload),
+        )
+
+    def idle_timeout(self):
+        # Keep replaying the spool while no new records arrive
+        return self.retry_interval
+
+    def on_idle(self):
+        with self._send_lock:
+            try:
+                self.replay()
+            except Exception as e:
+                logging.getLogger().error(
+                    f"Error in NetworkLogHandler: {str(e)}"
+                )
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            "sent_batches": self.sent_batches,
+            "sent_records": self.sent_records,
+            "failed_sends": self.failed_sends,
+            "last_error": self.last_error,
+            "spooled_batches": len(self.spool),
+            "spooled_records": self.spool.records,
+            "spool_bytes": self.spool.bytes,
+            "spool_max_bytes": self.spool.max_bytes,
+            "spool_dropped": self.spool.dropped,
+            "spool_oldest_age": self.spool.oldest_age(),
+        }
+
+    def close(self):
+        super().close()
+        self.transport.close()
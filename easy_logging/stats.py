@@ -0,0 +1,240 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import Counter
+from typing import List, Optional
+
+from .shards import list_shards, pid_is_running, shard_filename, shard_pid
+
+# Logger the periodic summary records are written to
+STATS_LOGGER = "easy.stats"
+
+_handlers = weakref.WeakSet()
+_handlers_lock = threading.Lock()
+_started = time.time()
+
+
+class HandlerStats:
+    """
+    Counters and timers of one handler: records per logger, time spent
+    formatting and writing, bytes written, rotations and errors.
+
+    Handlers update them once per batch, so the cost is a lock and a few
+    additions per write() call rather than per record.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.records = 0
+        self.by_logger = Counter()
+        self.batches = 0
+        self.format_time = 0.0
+        self.write_time = 0.0
+        self.bytes = 0
+        self.rotations = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+
+    def add_batch(
+        self, records, format_time: float, write_time: float, size: int
+    ) -> None:
+        with self.lock:
+            self.records += len(records)
+            for record in records:
+                self.by_logger[record.name] += 1
+            self.batches += 1
+            self.format_time += format_time
+            self.write_time += write_time
+            self.bytes += size
+
+    def add_rotation(self) -> None:
+        with self.lock:
+            self.rotations += 1
+
+    def add_error(self, error) -> None:
+        with self.lock:
+            self.errors += 1
+            self.last_error = str(error)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "records": self.records,
+                "by_logger": dict(self.by_logger),
+                "batches": self.batches,
+                "format_time": round(self.format_time, 6),
+                "write_time": round(self.write_time, 6),
+                "bytes": self.bytes,
+                "rotations": self.rotations,
+                "errors": self.errors,
+                "last_error": self.last_error,
+            }
+
+
+def register(handler) -> HandlerStats:
+    """Give ``handler`` its counters and include it in ``get_stats()``."""
+    handler.metrics = HandlerStats()
+    with _handlers_lock:
+        _handlers.add(handler)
+    return handler.metrics
+
+
+def get_handler_name(handler) -> str:
+    if handler.name:
+        return handler.name
+    target = getattr(handler, "baseFilename", None) or hex(id(handler))
+    return f"{type(handler).__name__}({target})"
+
+
+def get_stats() -> dict:
+    """
+    Counters of every easy_logging handler in this process, plus the
+    handler's own ``stats()`` (queue depth, drops, spool) where it has one.
+    """
+    with _handlers_lock:
+        handlers = list(_handlers)
+    stats = {}
+    loggers = Counter()
+    for handler in handlers:
+        data = handler.metrics.snapshot()
+        loggers.update(data["by_logger"])
+        if hasattr(handler, "stats"):
+            data.update(handler.stats())
+        stats[get_handler_name(handler)] = data
+    return {
+        "pid": os.getpid(),
+        "timestamp": time.time(),
+        "uptime": round(time.time() - _started, 3),
+        "loggers": dict(loggers),
+        "handlers": stats,
+    }
+
+
+def reset_stats() -> None:
+    global _started
+    with _handlers_lock:
+        handlers = list(_handlers)
+    for handler in handlers:
+        handler.metrics.reset()
+    _started = time.time()
+
+
+class StatsReporter:
+    """
+    Logs ``get_stats()`` to the "easy.stats" logger every ``interval``
+    seconds, and with ``filename`` also writes it to a per-process JSON
+    file ("stats.json" -> "stats.<pid>.json") for the ``easy_logging_stats``
+    command.
+    """
+
+    def __init__(self, interval: float, filename: Optional[str] = None):
+        self.interval = interval
+        self.filename = filename
+        self.logger = logging.getLogger(STATS_LOGGER)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="easy-logging-stats", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.report()
+            except Exception as e:
+                logging.getLogger().error(f"Error in StatsReporter: {str(e)}")
+
+    def report(self) -> dict:
+        stats = get_stats()
+        self.logger.info(
+            "Easy logging stats", extra={"extra": {"stats": stats}}
+        )
+        if self.filename:
+            self.write_snapshot(stats)
+        return stats
+
+    def snapshot_path(self) -> str:
+        return shard_filename(os.path.abspath(self.filename), os.getpid())
+
+    def write_snapshot(self, stats: dict) -> None:
+        path = self.snapshot_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(stats, file)
+        os.replace(temporary, path)
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join()
+        if self.filename:
+            try:
+                os.remove(self.snapshot_path())
+            except OSError:
+                pass
+
+
+reporter: Optional[StatsReporter] = None
+
+
+def start_reporter(
+    interval: float, filename: Optional[str] = None
+) -> StatsReporter:
+    """Start the periodic summary records (once per process)."""
+    global reporter
+    if reporter is None:
+        reporter = StatsReporter(interval, filename)
+        reporter.start()
+        atexit.register(reporter.close)
+    return reporter
+
+
+def read_snapshots(filename: str) -> List[dict]:
+    """
+    Latest snapshot of every running process writing to ``filename``. Files
+    left by processes that died without removing theirs are deleted.
+    """
+    filename = os.path.abspath(filename)
+    snapshots = []
+    for path in list_shards(filename):
+        if not pid_is_running(shard_pid(filename, path)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            continue
+        try:
+            with open(path) as file:
+                snapshots.append(json.load(file))
+        except (OSError, ValueError):
+            # The process removed it while exiting
+            continue
+    return snapshots
+
+
+def _after_fork_in_child() -> None:
+    # Counters and the reporter thread belong to the parent process, and
+    # a lock held by one of its threads would never be released
+    global _handlers_lock
+    _handlers_lock = threading.Lock()
+    for handler in list(_handlers):
+        handler.metrics.lock = threading.Lock()
+    reset_stats()
+    if reporter is not None:
+        reporter.start()
+
+
+if hasattr(os, "register_at_fork"):  # pragma: no cover - Windows
+    os.register_at_fork(after_in_child=_after_fork_in_child)
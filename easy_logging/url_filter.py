@@ -0,0 +1,113 @@
+import re
+from functools import lru_cache
+from typing import Callable, Iterable, Optional
+
+from django.urls import Resolver404, resolve
+
+
+# A global inline flag such as "(?i)": inside an alternation it would apply
+# to every pattern on Python < 3.11 and fails to compile on later versions
+GLOBAL_FLAGS = re.compile(r"\(\?[aiLmsux]+\)")
+
+
+def compile_patterns(patterns: Iterable[str]) -> Optional[Callable]:
+    """
+    Merge URL regexes into a single alternation and return its matcher.
+    Patterns with global inline flags are compiled and matched on their own.
+    """
+    patterns = list(patterns)
+    if not patterns:
+        return None
+    merged = [p for p in patterns if not GLOBAL_FLAGS.search(p)]
+    matchers = [re.compile(p).match for p in patterns if GLOBAL_FLAGS.search(p)]
+    if merged:
+        matchers.insert(
+            0, re.compile("|".join(f"(?:{p})" for p in merged)).match
+        )
+    if len(matchers) == 1:
+        return matchers[0]
+    return lambda url: any(match(url) for match in matchers)
+
+
+def get_url_name(path_info: str) -> Optional[str]:
+    try:
+        return resolve(path_info).view_name
+    except Resolver404:
+        return None
+
+
+class URLFilter:
+    """
+    Decides whether a request is logged. The rules are compiled once and the
+    decision for each (path, method) is kept in a bounded LRU cache.
+
+    A request is skipped when its path, URL name or method is unregistered.
+    When registered paths or URL names are set, the request must match one of
+    them; when registered methods are set, its method must be one of them.
+    """
+
+    def __init__(
+        self,
+        unregistered_urls: Iterable[str] = (),
+        registered_urls: Iterable[str] = (),
+        unregistered_names: Iterable[str] = (),
+        registered_names: Iterable[str] = (),
+        unregistered_methods: Iterable[str] = (),
+        registered_methods: Iterable[str] = (),
+        cache_size: int = 1024,
+    ):
+        self.unregistered_match = compile_patterns(unregistered_urls)
+        self.registered_match = compile_patterns(registered_urls)
+        self.unregistered_names = frozenset(unregistered_names)
+        self.registered_names = frozenset(registered_names)
+        self.unregistered_methods = frozenset(
+            method.upper() for method in unregistered_methods
+        )
+        self.registered_methods = frozenset(
+            method.upper() for method in registered_methods
+        )
+        self.uses_names = bool(self.unregistered_names or self.registered_names)
+        self.should_log = lru_cache(maxsize=cache_size)(self._evaluate)
+
+    def _evaluate(
+        self,
+        path: str,
+        method: Optional[str] = None,
+        path_info: Optional[str] = None,
+    ) -> bool:
+        """
+        ``path`` is matched against the URL patterns; URL names are resolved
+        from ``path_info``, the path without the script prefix (``path`` if
+        not given).
+        """
+        if method is not None:
+            if method in self.unregistered_methods:
+                return False
+            if (
+                self.registered_methods
+                and method not in self.registered_methods
+            ):
+                return False
+
+        # check if current url is blacklisted
+        if self.unregistered_match and self.unregistered_match(path):
+            return False
+
+        if self.uses_names:
+            name = get_url_name(path if path_info is None else path_info)
+        else:
+            name = None
+        if name is not None and name in self.unregistered_names:
+            return False
+
+        # only audit URLs listed in registered urls or names (if set)
+        if self.registered_match or self.registered_names:
+            if self.registered_match and self.registered_match(path):
+                return True
+            return name is not None and name in self.registered_names
+
+        # all good
+        return True
+
+    def cache_clear(self):
+        self.should_log.cache_clear()
@@ -1,4 +1,11 @@
-from easy_logging.constants import CONSOLE_FORMAT
+from typing import List, Optional
+
+from easy_logging.constants import (
+    CONSOLE_FORMAT,
+    FSYNC_POLICIES,
+    NETWORK_TRANSPORTS,
+    OVERFLOW_POLICIES,
+)
 from easy_logging.logger_level import API, AUDIT
 
 
@@ -8,21 +15,42 @@ def get_console_formatter() -> dict:
     }
 
 
-def get_json_file_formatter() -> dict:
+def get_json_file_formatter(
+    encoder: str = "auto",
+    fields: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+) -> dict:
     return {
         "()": "easy_logging.formatter.JsonFileFormatter",
+        "encoder": encoder,
+        "fields": fields,
+        "exclude": exclude,
     }
 
 
-def get_api_file_formatter() -> dict:
+def get_api_file_formatter(
+    encoder: str = "auto",
+    fields: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+) -> dict:
     return {
         "()": "easy_logging.formatter.APIFormatter",
+        "encoder": encoder,
+        "fields": fields,
+        "exclude": exclude,
     }
 
 
-def get_audit_file_formatter() -> dict:
+def get_audit_file_formatter(
+    encoder: str = "auto",
+    fields: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+) -> dict:
     return {
         "()": "easy_logging.formatter.AuditFormatter",
+        "encoder": encoder,
+        "fields": fields,
+        "exclude": exclude,
     }
 
 
@@ -32,8 +60,11 @@ def get_json_file_handler(
     formatter: str = "json",
     max_bytes: int = 1024 * 1024 * 10,
     backup_count: int = 5,
+    max_age: int = 0,
+    compress: Optional[str] = None,
+    shard: bool = False,
 ) -> dict:
-    return {
+    handler = {
         "level": level,
         "class": "logging.handlers.RotatingFileHandler",
         "formatter": formatter,
@@ -41,31 +72,174 @@ def get_json_file_handler(
         "maxBytes": max_bytes,
         "backupCount": backup_count,
     }
+    if compress is not None or max_age or shard:
+        # Segment rotation and shards need EasyLogHandler
+        handler.update(
+            {
+                "class": "easy_logging.handlers.EasyLogHandler",
+                "max_age": max_age,
+                "compress": compress,
+                "shard": shard,
+            }
+        )
+    return handler
 
 
 def get_api_handler(
     filename: str = "easy_logs/api.log",
     formatter: str = "api_json",
+    fsync: str = FSYNC_POLICIES[0],
+    fsync_interval: float = 1.0,
+    max_bytes: int = 1024 * 1024 * 10,
+    backup_count: int = 5,
+    max_age: int = 0,
+    compress: Optional[str] = None,
+    shard: bool = False,
 ) -> dict:
     return {
         "level": API,
         "class": "easy_logging.handlers.EasyLogHandler",
         "filename": filename,
-        "maxBytes": 1024 * 1024 * 10,  # 10MB
-        "backupCount": 5,
+        "maxBytes": max_bytes,
+        "backupCount": backup_count,
+        "max_age": max_age,
+        "compress": compress,
+        "shard": shard,
         "formatter": formatter,
+        "fsync": fsync,
+        "fsync_interval": fsync_interval,
     }
 
 
 def get_audit_handler(
     filename: str = "easy_logs/audit.log",
     formatter: str = "audit_json",
+    fsync: str = FSYNC_POLICIES[0],
+    fsync_interval: float = 1.0,
+    max_bytes: int = 1024 * 1024 * 10,
+    backup_count: int = 5,
+    max_age: int = 0,
+    compress: Optional[str] = None,
+    shard: bool = False,
 ) -> dict:
     return {
         "level": AUDIT,
         "class": "easy_logging.handlers.EasyLogHandler",
         "filename": filename,
-        "maxBytes": 1024 * 1024 * 10,  # 10MB
-        "backupCount": 5,
+        "maxBytes": max_bytes,
+        "backupCount": backup_count,
+        "max_age": max_age,
+        "compress": compress,
+        "shard": shard,
         "formatter": formatter,
+        "fsync": fsync,
+        "fsync_interval": fsync_interval,
+    }
+
+
+def get_queued_handler(
+    level: int = API,
+    filename: str = "easy_logs/api.log",
+    formatter: str = "api_json",
+    queue_size: int = 10000,
+    overflow: str = OVERFLOW_POLICIES[0],
+    batch_size: int = 500,
+    batch_interval: int = 0,
+    fsync: str = FSYNC_POLICIES[0],
+    fsync_interval: float = 1.0,
+    max_bytes: int = 1024 * 1024 * 10,
+    backup_count: int = 5,
+    max_age: int = 0,
+    compress: Optional[str] = None,
+    shard: bool = False,
+) -> dict:
+    """
+    Handler that writes from a background thread, so logging calls only
+    enqueue the record. ``overflow`` is one of "block", "drop_oldest" or
+    "drop_newest". Up to ``batch_size`` records, collected for at most
+    ``batch_interval`` milliseconds, are written with one write() call and
+    synced according to ``fsync`` ("never", "batch" or "interval").
+    ``compress`` ("none", "gzip" or "zstd") or ``max_age`` (seconds) switch
+    to timestamped segments compressed in the background. ``shard`` gives
+    every process its own file.
+    """
+    return {
+        "level": level,
+        "class": "easy_logging.handlers.QueuedEasyLogHandler",
+        "filename": filename,
+        "maxBytes": max_bytes,
+        "backupCount": backup_count,
+        "max_age": max_age,
+        "compress": compress,
+        "shard": shard,
+        "formatter": formatter,
+        "queue_size": queue_size,
+        "overflow": overflow,
+        "batch_size": batch_size,
+        "batch_interval": batch_interval,
+        "fsync": fsync,
+        "fsync_interval": fsync_interval,
+    }
+
+
+def get_network_handler(
+    address: str,
+    level: int = API,
+    formatter: str = "api_json",
+    transport: str = NETWORK_TRANSPORTS[0],
+    timeout: float = 5.0,
+    spool_dir: str = "easy_logs/spool",
+    spool_max_bytes: int = 100 * 1024 * 1024,
+    retry_interval: float = 5.0,
+    queue_size: int = 10000,
+    overflow: str = OVERFLOW_POLICIES[0],
+    batch_size: int = 500,
+    batch_interval: int = 100,
+) -> dict:
+    """
+    Handler that sends batches of records to a collector over "http"
+    (``address`` is a URL) or "tcp" (``address`` is "host:port"). Batches
+    that cannot be sent are spooled to ``spool_dir`` (at most
+    ``spool_max_bytes``) and replayed in order every ``retry_interval``
+    seconds.
+    """
+    return {
+        "level": level,
+        "class": "easy_logging.sinks.NetworkLogHandler",
+        "formatter": formatter,
+        "address": address,
+        "transport": transport,
+        "timeout": timeout,
+        "spool_dir": spool_dir,
+        "spool_max_bytes": spool_max_bytes,
+        "retry_interval": retry_interval,
+        "queue_size": queue_size,
+        "overflow": overflow,
+        "batch_size": batch_size,
+        "batch_interval": batch_interval,
+    }
+
+
+def get_database_handler(
+    level: int = AUDIT,
+    using: Optional[str] = None,
+    queue_size: int = 10000,
+    overflow: str = OVERFLOW_POLICIES[0],
+    batch_size: int = 500,
+    batch_interval: int = 1000,
+) -> dict:
+    """
+    Handler that stores audit records as ``AuditEvent`` rows (requires
+    "easy_logging.db" in INSTALLED_APPS). Up to ``batch_size`` records,
+    collected for at most ``batch_interval`` milliseconds, are inserted with
+    one bulk_create from a background thread on the ``using`` alias.
+    """
+    return {
+        "level": level,
+        "class": "easy_logging.db.handlers.DatabaseLogHandler",
+        "using": using,
+        "queue_size": queue_size,
+        "overflow": overflow,
+        "batch_size": batch_size,
+        "batch_interval": batch_interval,
     }
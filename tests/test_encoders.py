@@ -0,0 +1,50 @@
+import datetime
+import decimal
+import uuid
+
+import pytest
+
+from easy_logging.encoders import (
+    JSONEncoder,
+    MsgspecEncoder,
+    OrjsonEncoder,
+    msgspec,
+    orjson,
+)
+
+RECORD = {
+    "timestamp": "2024-01-01 00:00:00.000",
+    "message": "UPDATE event for Patient (id: 1)",
+    "user": {"id": "7", "first_name": "Zoë"},
+    "extra": {
+        "duration": datetime.timedelta(hours=1),
+        "created": datetime.datetime(
+            2024, 1, 1, 12, 30, 15, 250000, tzinfo=datetime.timezone.utc
+        ),
+        "loaded": datetime.datetime(2024, 1, 1, 12, 30),
+        "born": datetime.date(1990, 5, 17),
+        "opens": datetime.time(8, 30),
+        "payload": b"x",
+        "price": decimal.Decimal("9.90"),
+        "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "tags": (1, 2),
+        "changes": {"count": {"before": 2**70, "after": None}},
+        "ratio": 0.5,
+        "active": True,
+    },
+}
+
+BACKENDS = [
+    OrjsonEncoder if orjson is not None else None,
+    MsgspecEncoder if msgspec is not None else None,
+]
+
+
+@pytest.mark.parametrize(
+    "backend", [backend for backend in BACKENDS if backend is not None]
+)
+def test_backends_write_the_same_output(backend):
+    expected = JSONEncoder().dumps_bytes(RECORD)
+
+    assert backend().dumps_bytes(RECORD) == expected
+    assert backend().dumps(RECORD) == expected.decode("utf-8")
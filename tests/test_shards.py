@@ -0,0 +1,41 @@
+import logging
+from logging.handlers import RotatingFileHandler
+
+from easy_logging.shards import list_log_files, merge_lines
+
+
+def write_rotated(filename, count):
+    """Write ``count`` lines, one per file, into numbered backups."""
+    handler = RotatingFileHandler(filename, backupCount=count)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    for second in range(count):
+        if second:
+            handler.doRollover()
+        timestamp = f"2024-01-01 00:00:{second:02d}.000"
+        record = logging.makeLogRecord(
+            {"msg": f'{{"timestamp":"{timestamp}","n":{second}}}'}
+        )
+        handler.emit(record)
+    handler.close()
+
+
+def test_numbered_backups_are_listed_oldest_first(tmp_path):
+    filename = str(tmp_path / "api.log")
+    write_rotated(filename, 4)
+
+    assert list_log_files(filename) == [
+        [f"{filename}.3", f"{filename}.2", f"{filename}.1", filename]
+    ]
+
+
+def test_merge_lines_reads_numbered_backups_in_order(tmp_path):
+    filename = str(tmp_path / "api.log")
+    write_rotated(filename, 4)
+
+    lines = list(merge_lines(filename, until="2024-01-01 00:00:03"))
+
+    assert [line.split(b'"n":')[1] for line in lines] == [
+        b"0}\n",
+        b"1}\n",
+        b"2}\n",
+    ]